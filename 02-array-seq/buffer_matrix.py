@@ -0,0 +1,175 @@
+"""
+2-D views over an ``array``, ``bytearray`` or ``mmap`` without copies
+
+``8_memoryviews.py`` reshapes a buffer with ``memoryview.cast('B', [2, 3])``,
+but a ``memoryview`` of more than one dimension cannot be sliced. A
+``BufferMatrix`` keeps a flat ``memoryview`` plus an offset, a shape and the
+strides (in items), so rows, columns, sub-matrices and the transpose are
+all views of the same memory; each row or column is a 1-D strided slice::
+
+    >>> from array import array
+    >>> numbers = array('d', range(12))
+    >>> m = BufferMatrix(numbers, (3, 4))
+    >>> m
+    BufferMatrix([[0.0, 1.0, 2.0, 3.0], [4.0, 5.0, 6.0, 7.0], [8.0, 9.0, 10.0, 11.0]])
+    >>> m[1].tolist(), m[:, 2].tolist(), m[2, -1]
+    ([4.0, 5.0, 6.0, 7.0], [2.0, 6.0, 10.0], 11.0)
+    >>> m[1:, ::2]
+    BufferMatrix([[4.0, 6.0], [8.0, 10.0]])
+    >>> m.T.shape, m.T.strides, m.T[3].tolist()
+    ((4, 3), (1, 4), [3.0, 7.0, 11.0])
+
+The reductions go row by row over those views, with ``sum``, ``min`` and
+``max`` looping in C; ``axis=0`` works on the columns::
+
+    >>> m.sum(), m.max(axis=0), m.min(axis=None)
+    (array('d', [6.0, 22.0, 38.0]), array('d', [8.0, 9.0, 10.0, 11.0]), 0.0)
+
+Writes go to the original buffer::
+
+    >>> m.T[0, 2] = -1
+    >>> numbers[8]
+    -1.0
+    >>> [(corner, block.tolist()) for corner, block in m.blocks(2, 3)]
+    ... # doctest: +NORMALIZE_WHITESPACE
+    [((0, 0), [[0.0, 1.0, 2.0], [4.0, 5.0, 6.0]]), ((0, 3), [[3.0], [7.0]]),
+     ((2, 0), [[-1.0, 9.0, 10.0]]), ((2, 3), [[11.0]])]
+
+``bytearray`` and ``mmap`` have no typecode, so it must be given::
+
+    >>> raw = bytearray(array('i', [1, 2, 3, 4, 5, 6]).tobytes())
+    >>> BufferMatrix(raw, (2, 3), typecode='i').sum(axis=0)
+    array('q', [5, 7, 9])
+"""
+
+from array import array
+
+# las sumas de enteros se acumulan en 64 bits, las de floats en double
+SUM_TYPECODES = {'f': 'd', 'd': 'd', 'L': 'Q', 'Q': 'Q'}
+
+
+class BufferMatrix:
+
+    def __init__(self, buffer, shape, typecode=None, offset=0, strides=None):
+        data = memoryview(buffer)
+        if typecode is None:
+            typecode = data.format
+        if data.format != typecode or data.ndim != 1:
+            data = data.cast('B').cast(typecode)
+        rows, cols = shape
+        if strides is None:
+            strides = (cols, 1)
+        self._data = data
+        self.shape = (rows, cols)
+        self.strides = tuple(strides)
+        self.offset = offset
+        if rows and cols and not (0 <= self._index(0, 0) < len(data) and
+                                  0 <= self._index(rows - 1, cols - 1)
+                                  < len(data)):
+            raise ValueError('shape {} does not fit in a buffer of {} items'
+                             .format(shape, len(data)))
+
+    @property
+    def typecode(self):
+        return self._data.format
+
+    @property
+    def T(self):
+        """Transposed view"""
+        return self._view(self.offset, self.shape[::-1], self.strides[::-1])
+
+    def transpose(self):
+        return self.T
+
+    def _view(self, offset, shape, strides):
+        matrix = object.__new__(type(self))
+        matrix._data = self._data
+        matrix.offset, matrix.shape, matrix.strides = offset, shape, strides
+        return matrix
+
+    def _index(self, row, col):
+        return self.offset + row * self.strides[0] + col * self.strides[1]
+
+    def _line(self, start, count, step):
+        """1-D view of ``count`` items from ``start`` every ``step``"""
+        if count <= 0:
+            return self._data[0:0]
+        last = start + (count - 1) * step
+        if step > 0:
+            return self._data[start:last + 1:step]
+        return self._data[start:last - 1 if last else None:step]
+
+    def __len__(self):
+        return self.shape[0]
+
+    def row(self, i):
+        i = range(self.shape[0])[i]
+        return self._line(self._index(i, 0), self.shape[1], self.strides[1])
+
+    def col(self, j):
+        j = range(self.shape[1])[j]
+        return self._line(self._index(0, j), self.shape[0], self.strides[0])
+
+    def __iter__(self):
+        return map(self.row, range(self.shape[0]))
+
+    def _key(self, key):
+        if isinstance(key, tuple):
+            return key
+        return key, slice(None)
+
+    def __getitem__(self, key):
+        """``m[i, j]`` is an item, ``m[i]`` and ``m[:, j]`` 1-D views, and
+        ``m[rows, cols]`` with slices a ``BufferMatrix``"""
+        rows, cols = self._key(key)
+        if isinstance(rows, slice) and isinstance(cols, slice):
+            rows = range(self.shape[0])[rows]
+            cols = range(self.shape[1])[cols]
+            return self._view(self._index(rows.start, cols.start),
+                              (len(rows), len(cols)),
+                              (self.strides[0] * rows.step,
+                               self.strides[1] * cols.step))
+        if isinstance(rows, slice):
+            return self[rows, cols:cols + 1 or None].col(0)
+        if isinstance(cols, slice):
+            return self[rows:rows + 1 or None, cols].row(0)
+        return self._data[self._item(rows, cols)]
+
+    def _item(self, row, col):
+        return self._index(range(self.shape[0])[row], range(self.shape[1])[col])
+
+    def __setitem__(self, key, value):
+        self._data[self._item(*key)] = value
+
+    def blocks(self, height, width):
+        """``((row, col), block)`` pairs covering the matrix in tiles of
+        ``height`` x ``width`` (smaller on the edges)"""
+        rows, cols = self.shape
+        for i in range(0, rows, height):
+            for j in range(0, cols, width):
+                yield (i, j), self[i:i + height, j:j + width]
+
+    def tolist(self):
+        return [line.tolist() for line in self]
+
+    def __repr__(self):
+        return '{}({!r})'.format(type(self).__name__, self.tolist())
+
+    def _reduce(self, function, axis):
+        matrix = self.T if axis == 0 else self
+        if axis is None:
+            return function(map(function, matrix))
+        typecode = self.typecode
+        if function is sum:
+            typecode = SUM_TYPECODES.get(typecode, 'q')
+        return array(typecode, map(function, matrix))
+
+    def sum(self, axis=1):
+        """Sum of each row (``axis=1``), column (0) or of everything"""
+        return self._reduce(sum, axis)
+
+    def min(self, axis=1):
+        return self._reduce(min, axis)
+
+    def max(self, axis=1):
+        return self._reduce(max, axis)
@@ -0,0 +1,57 @@
+import sys
+import time
+import tracemalloc
+from array import array
+
+from buffer_matrix import BufferMatrix
+
+SIZES = [500, 1000, 2000, 3000]
+BLOCK = 256
+
+
+def with_views(numbers, side):
+    m = BufferMatrix(numbers, (side, side))
+    rows = m.sum()
+    cols = m.T.max()
+    # máximo de cada bloque, sin sacar el bloque de la matriz
+    blocks = max(block.max(axis=None) for _, block in m.blocks(BLOCK, BLOCK))
+    return rows[-1], cols[-1], blocks
+
+
+def with_lists(numbers, side):
+    # lo mismo copiando la matriz a listas de listas
+    m = memoryview(numbers).cast('B').cast('d', [side, side]).tolist()
+    rows = [sum(row) for row in m]
+    cols = [max(col) for col in zip(*m)]
+    blocks = max(max(max(row[j:j + BLOCK]) for row in m[i:i + BLOCK])
+                 for i in range(0, side, BLOCK) for j in range(0, side, BLOCK))
+    return rows[-1], cols[-1], blocks
+
+
+def measure(function, numbers, side):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    result = function(numbers, side)
+    seconds = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, seconds, peak
+
+
+def main(sizes):
+    print('{:>6} | {:>9} | {:>9} | {:>12} | {:>9} | {:>12}'.format(
+        'side', 'data MB', 'views s', 'views peak', 'lists s', 'lists peak'))
+    for side in sizes:
+        # el buffer se crea antes de tracemalloc: solo se mide lo que añade
+        # cada forma de recorrerlo
+        numbers = array('d', range(side * side))
+        views, views_s, views_peak = measure(with_views, numbers, side)
+        lists, lists_s, lists_peak = measure(with_lists, numbers, side)
+        assert views == lists
+        print('{:6} | {:9.1f} | {:9.3f} | {:12,} | {:9.3f} | {:12,}'.format(
+            side, len(numbers) * numbers.itemsize / 2**20, views_s,
+            views_peak, lists_s, lists_peak))
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or SIZES)
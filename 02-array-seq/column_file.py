@@ -0,0 +1,195 @@
+"""
+Typed column files opened with ``mmap``
+
+``7_arrays.py`` writes doubles with ``array.tofile`` and reads them back with
+``fromfile``, which copies the whole file into a new array. A column file
+keeps several named columns of the same length, each one aligned to
+``ALIGN`` bytes after a small header::
+
+    header   magic b'COLS', byte order, column count (H), length and
+             capacity in rows (Q, Q)
+    columns  name (32s), typecode, data offset (Q) for each column
+    data     capacity * itemsize bytes per column
+
+Opening the file maps it and each column is a ``memoryview`` cast to its
+typecode: nothing is read until it is used, and slices don't copy::
+
+    >>> import os, tempfile
+    >>> from array import array
+    >>> path = os.path.join(tempfile.mkdtemp(), 'points.col')
+    >>> ColumnFile.create(path, {'x': array('d', [1.5, 2.5, 3.5]),
+    ...                          'n': array('q', [10, 20, 30])}).close()
+    >>> with ColumnFile(path) as table:
+    ...     x = table['x']
+    ...     print(table.names, len(table), x.format, x[1:].tolist())
+    ...     print(sum(table['n']), table.read('n', 1, 2))
+    ...     x.release()
+    ['x', 'n'] 3 d [2.5, 3.5]
+    60 array('q', [20])
+
+``extend`` appends rows in place while there is spare capacity; when there
+isn't, the file grows (doubling the capacity) and the columns are moved
+inside it. Views taken before must be released, or ``mmap`` raises
+``BufferError``::
+
+    >>> with ColumnFile(path, writable=True) as table:
+    ...     table.extend({'x': [4.5, 5.5], 'n': array('q', [40, 50])})
+    ...     print(len(table), table.capacity, table.read('x', 2).tolist())
+    5 6 [3.5, 4.5, 5.5]
+
+A file written on a machine with the other byte order can still be read, but
+its columns are copies, swapped with ``array.byteswap``.
+"""
+
+import mmap
+import struct
+import sys
+from array import array
+
+MAGIC = b'COLS'
+# la cabecera siempre en little endian; los datos en el orden de la máquina
+HEADER = struct.Struct('<4scxHQQ')
+COLUMN = struct.Struct('<32sc7xQ')
+ALIGN = 64
+BYTE_ORDERS = {'little': b'<', 'big': b'>'}
+
+
+def _align(offset):
+    return -(-offset // ALIGN) * ALIGN
+
+
+def _layout(typecodes, capacity):
+    """Offsets of the columns and total size of the file"""
+    offset = _align(HEADER.size + COLUMN.size * len(typecodes))
+    offsets = []
+    for typecode in typecodes:
+        offsets.append(offset)
+        offset = _align(offset + capacity * array(typecode).itemsize)
+    return offsets, offset
+
+
+class ColumnFile:
+
+    def __init__(self, path, writable=False):
+        self.path = path
+        self._file = open(path, 'r+b' if writable else 'rb')
+        access = mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=access)
+        magic, byteorder, count, self._length, self.capacity = \
+            HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            raise ValueError('{!r} is not a column file'.format(path))
+        self.swapped = byteorder != BYTE_ORDERS[sys.byteorder]
+        if self.swapped and writable:
+            raise ValueError('cannot write a column file of the other '
+                             'byte order')
+        self._columns = {}
+        for i in range(count):
+            name, typecode, offset = COLUMN.unpack_from(
+                self._mmap, HEADER.size + COLUMN.size * i)
+            self._columns[name.rstrip(b'\0').decode('utf-8')] = [
+                typecode.decode('ascii'), offset]
+
+    @classmethod
+    def create(cls, path, columns, capacity=None):
+        """Write ``columns``, a mapping of name to array (or typecode, for
+        an empty column), and open the file for writing"""
+        columns = {name: array(values) if isinstance(values, str)
+                   else values for name, values in columns.items()}
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError('columns of different lengths')
+        length = lengths.pop() if lengths else 0
+        capacity = max(length, capacity or 0)
+        if any(len(name.encode('utf-8')) > 32 for name in columns):
+            raise ValueError('column names are limited to 32 bytes')
+        typecodes = [values.typecode for values in columns.values()]
+        offsets, size = _layout(typecodes, capacity)
+        with open(path, 'wb') as fp:
+            fp.write(HEADER.pack(MAGIC, BYTE_ORDERS[sys.byteorder],
+                                 len(columns), length, capacity))
+            for (name, values), offset in zip(columns.items(), offsets):
+                fp.write(COLUMN.pack(name.encode('utf-8'),
+                                     values.typecode.encode('ascii'), offset))
+            for values, offset in zip(columns.values(), offsets):
+                fp.seek(offset)
+                values.tofile(fp)
+            fp.truncate(size)
+        return cls(path, writable=True)
+
+    @property
+    def names(self):
+        return list(self._columns)
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, name):
+        """The column ``name``: a ``memoryview`` of the mapped file"""
+        typecode, offset = self._columns[name]
+        size = array(typecode).itemsize
+        view = memoryview(self._mmap)[offset:offset + self._length * size]
+        if self.swapped:
+            values = array(typecode, view.tobytes())
+            values.byteswap()
+            return memoryview(values)
+        return view.cast(typecode)
+
+    def read(self, name, start=0, stop=None):
+        """Copy of ``column[start:stop]`` as an array; only those rows are
+        read from the file"""
+        with self[name] as view:
+            return array(view.format, view[start:stop].tobytes())
+
+    def extend(self, columns):
+        """Append the rows of ``columns``, a mapping with every column"""
+        if set(columns) != set(self._columns):
+            raise KeyError('extend needs the columns {}'.format(self.names))
+        columns = {name: array(self._columns[name][0], values)
+                   for name, values in columns.items()}
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError('columns of different lengths')
+        length = self._length + lengths.pop()
+        if length > self.capacity:
+            self._grow(max(length, 2 * self.capacity))
+        for name, values in columns.items():
+            typecode, offset = self._columns[name]
+            start = offset + self._length * values.itemsize
+            self._mmap[start:start + len(values) * values.itemsize] = values
+        self._length = length
+        self._write_header()
+
+    def _grow(self, capacity):
+        typecodes = [typecode for typecode, _ in self._columns.values()]
+        offsets, size = _layout(typecodes, capacity)
+        self._mmap.resize(size)
+        # de la última a la primera: ninguna columna pisa a la siguiente antes de moverla
+        for column, offset in reversed(list(zip(self._columns.values(),
+                                                offsets))):
+            used = self._length * array(column[0]).itemsize
+            self._mmap.move(offset, column[1], used)
+            column[1] = offset
+        self.capacity = capacity
+        for i, (name, (typecode, offset)) in enumerate(self._columns.items()):
+            COLUMN.pack_into(self._mmap, HEADER.size + COLUMN.size * i,
+                             name.encode('utf-8'), typecode.encode('ascii'),
+                             offset)
+
+    def _write_header(self):
+        HEADER.pack_into(self._mmap, 0, MAGIC, BYTE_ORDERS[sys.byteorder],
+                         len(self._columns), self._length, self.capacity)
+
+    def flush(self):
+        self._mmap.flush()
+
+    def close(self):
+        if not self._mmap.closed:
+            self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
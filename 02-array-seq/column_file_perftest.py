@@ -0,0 +1,86 @@
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from array import array
+from random import random
+
+from column_file import ColumnFile
+
+NUM_FLOATS = 10**7
+METHODS = ['fromfile', 'mmap slice', 'mmap scan']
+
+
+def rss_kb():
+    # RSS actual (no el pico): la segunda columna de /proc/self/statm
+    with open('/proc/self/statm') as fp:
+        return int(fp.read().split()[1]) * resource.getpagesize() // 1024
+
+
+def run(method, bin_path, col_path, size):
+    """Open the data with ``method``, in this process"""
+    rss_before = rss_kb()
+    t0 = time.perf_counter()
+    if method == 'fromfile':
+        floats = array('d')
+        with open(bin_path, 'rb') as fp:
+            floats.fromfile(fp, size)
+        opened = time.perf_counter() - t0
+        last = floats[-1]
+        total = sum(floats[size // 2:size // 2 + 1000])
+    else:
+        table = ColumnFile(col_path)
+        floats = table['x']
+        opened = time.perf_counter() - t0
+        last = floats[-1]
+        # solo se tocan las páginas de esas 1000 posiciones
+        total = sum(floats[size // 2:size // 2 + 1000])
+    seconds = time.perf_counter() - t0
+    if method == 'mmap scan':
+        # recorrer toda la columna carga todas sus páginas
+        total = sum(floats)
+    return {'method': method, 'open_ms': opened * 1e3,
+            'first_use_ms': seconds * 1e3, 'last': last, 'total': total,
+            'rss_kb': rss_kb() - rss_before}
+
+
+def main(size):
+    directory = tempfile.mkdtemp()
+    bin_path = os.path.join(directory, 'floats.bin')
+    col_path = os.path.join(directory, 'floats.col')
+    floats = array('d', (random() for i in range(size)))
+    t0 = time.perf_counter()
+    with open(bin_path, 'wb') as fp:
+        floats.tofile(fp)
+    print('tofile: {:.3f}s'.format(time.perf_counter() - t0))
+    t0 = time.perf_counter()
+    ColumnFile.create(col_path, {'x': floats}).close()
+    print('ColumnFile.create: {:.3f}s'.format(time.perf_counter() - t0))
+    del floats
+    print('{:>12} | {:>9} | {:>12} | {:>12}'.format(
+        'method', 'open ms', 'first use ms', 'RSS delta kB'))
+    results = []
+    for method in METHODS:
+        # cada método en su proceso: la caché de páginas es compartida, pero
+        # el RSS es el del proceso
+        child = subprocess.run(
+            [sys.executable, __file__, '--run', method, bin_path, col_path,
+             str(size)], capture_output=True, text=True, check=True)
+        result = json.loads(child.stdout)
+        results.append(result)
+        print('{method:>12} | {open_ms:9.3f} | {first_use_ms:12.3f} | '
+              '{rss_kb:12,}'.format(**result))
+    assert len({result['last'] for result in results}) == 1
+    os.remove(bin_path)
+    os.remove(col_path)
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['--run']:
+        method, bin_path, col_path, size = sys.argv[2:]
+        print(json.dumps(run(method, bin_path, col_path, int(size))))
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else NUM_FLOATS)
@@ -0,0 +1,213 @@
+"""
+Streaming reader for fixed-width files described by a slice schema
+
+``4_slicing.py`` cuts each line of an invoice with named ``slice`` objects.
+Here the same slices are applied to batches of lines read from an ``mmap``:
+each field becomes a column, cut with ``map(itemgetter(slice), lines)`` and
+converted with a single call per batch (``int`` parses bytes directly)::
+
+    >>> import os, tempfile
+    >>> path = os.path.join(tempfile.mkdtemp(), 'invoice.txt')
+    >>> with open(path, 'w') as fp:
+    ...     _ = fp.write(INVOICE_TEXT)
+    >>> batch = next(iter_batches(path, INVOICE, skip=1))
+    >>> batch['sku'], batch['unit_price']
+    (array('q', [1909, 1489, 1510, 1601]), array('q', [1750, 495, 2800, 3495]))
+    >>> batch['description'][:2]
+    ['Pimoroni PiBrella', '6mm Tactile Switch x20']
+    >>> next(iter_records(path, INVOICE, skip=1))
+    (1909, 'Pimoroni PiBrella', 1750, 3, 5250)
+    >>> schema = INVOICE[:2] + [Field('total', ITEM_TOTAL, decimals)]
+    >>> read_columns(path, schema, skip=1, workers=2)['total']
+    [Decimal('52.50'), Decimal('9.90'), Decimal('28.00'), Decimal('34.95')]
+
+Amounts are read as an int number of cents (``cents``) or as ``Decimal``
+(``decimals``); ``cents`` expects exactly two decimals, as in the invoice,
+and rejects any other amount instead of getting it wrong by 10 or 100::
+
+    >>> cents([b' $17.50', b'-4.95 ']), cents([])
+    (array('q', [1750, -495]), array('q'))
+    >>> cents([b'$17.50', b'$17.5'])
+    Traceback (most recent call last):
+      ...
+    ValueError: amount without two decimals: b'$17.5'
+"""
+
+import mmap
+import os
+import re
+from array import array
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+from operator import itemgetter
+
+BATCH_BYTES = 2 ** 22
+
+Field = namedtuple('Field', 'name slice convert')
+
+# el punto y los dos decimales del final de un importe
+DECIMALS_RE = re.compile(rb'\.[0-9][0-9](?![^ \t])')
+AMOUNT_RE = re.compile(rb'[ \t]*[-+$]*[0-9]+\.[0-9][0-9][ \t]*')
+
+
+def integers(values):
+    return array('q', map(int, values))
+
+
+def cents(values):
+    joined = b' '.join(values)
+    # un punto por importe y, al final de cada uno, punto y dos decimales:
+    # así cada importe tiene dos decimales, comprobado en C para todo el lote
+    if (joined.count(b'.') != len(values) or
+            len(DECIMALS_RE.findall(joined)) != len(values)):
+        for value in values:
+            if not AMOUNT_RE.fullmatch(value):
+                raise ValueError(
+                    'amount without two decimals: {!r}'.format(value))
+    # '$17.50' -> 1750: se quitan '$' y '.' de todo el lote de una vez
+    joined = joined.replace(b'$', b'').replace(b'.', b'')
+    return array('q', map(int, joined.split()))
+
+
+def decimals(values):
+    if not values:
+        return []
+    text = b'\n'.join(values).replace(b'$', b'').decode('ascii')
+    return list(map(Decimal, map(str.strip, text.split('\n'))))
+
+
+def text(values, encoding='utf-8'):
+    if not values:
+        return []
+    return list(map(str.strip, b'\n'.join(values).decode(encoding).split('\n')))
+
+
+SKU = slice(0, 6)
+DESCRIPTION = slice(6, 40)
+UNIT_PRICE = slice(40, 52)
+QUANTITY = slice(52, 55)
+ITEM_TOTAL = slice(55, None)
+
+INVOICE = [
+    Field('sku', SKU, integers),
+    Field('description', DESCRIPTION, text),
+    Field('unit_price', UNIT_PRICE, cents),
+    Field('quantity', QUANTITY, integers),
+    Field('item_total', ITEM_TOTAL, cents),
+]
+
+INVOICE_TEXT = """\
+0.....6.................................40........52...55........
+1909  Pimoroni PiBrella                     $17.50    3    $52.50
+1489  6mm Tactile Switch x20                 $4.95    2     $9.90
+1510  Panavise Jr. - PV-201                 $28.00    1    $28.00
+1601  PiTFT Mini Kit 320x240                $34.95    1    $34.95
+"""
+
+
+def convert_lines(lines, schema):
+    """Columns ``{name: values}`` of a list of lines (bytes)"""
+    return {field.name: field.convert(list(map(itemgetter(field.slice),
+                                               lines)))
+            for field in schema}
+
+
+def _skip_lines(octets, skip):
+    position = 0
+    for _ in range(skip):
+        position = octets.find(b'\n', position) + 1
+        if not position:
+            return len(octets)
+    return position
+
+
+def _open_mmap(path):
+    with open(path, 'rb') as fp:
+        if not os.fstat(fp.fileno()).st_size:
+            return None
+        return mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def iter_batches(path, schema, skip=0, start=0, end=None,
+                 batch_bytes=BATCH_BYTES):
+    """Columns of each batch of about ``batch_bytes`` of complete lines
+
+    ``start`` and ``end`` must be at the beginning of a line; empty lines
+    are ignored.
+    """
+    mm = _open_mmap(path)
+    if mm is None:
+        return
+    with mm:
+        end = len(mm) if end is None else end
+        position = max(start, _skip_lines(mm, skip))
+        while position < end:
+            stop = min(position + batch_bytes, end)
+            if stop < end:
+                # el lote acaba al final de una línea
+                newline = mm.find(b'\n', stop - 1, end)
+                stop = end if newline == -1 else newline + 1
+            lines = list(filter(None, mm[position:stop].splitlines()))
+            if lines:
+                yield convert_lines(lines, schema)
+            position = stop
+
+
+def iter_records(path, schema, skip=0):
+    """One tuple per line, with the converted fields"""
+    for batch in iter_batches(path, schema, skip):
+        yield from zip(*batch.values())
+
+
+def chunk_ranges(path, chunks, skip=0):
+    """``(start, end)`` offsets splitting ``path`` in whole lines"""
+    mm = _open_mmap(path)
+    if mm is None:
+        return []
+    with mm:
+        first = _skip_lines(mm, skip)
+        size = len(mm) - first
+        bounds = [first]
+        for i in range(1, chunks):
+            newline = mm.find(b'\n', first + size * i // chunks)
+            if newline == -1 or newline + 1 >= len(mm):
+                break
+            bounds.append(max(newline + 1, bounds[-1]))
+        bounds.append(len(mm))
+    return [(start, end) for start, end in zip(bounds, bounds[1:])
+            if start < end]
+
+
+def _read_range(path, schema, start, end):
+    return merge_batches(iter_batches(path, schema, start=start, end=end),
+                         schema)
+
+
+def merge_batches(batches, schema):
+    """Concatenate the columns of several batches"""
+    columns = None
+    for batch in batches:
+        if columns is None:
+            columns = batch
+        else:
+            for name, values in batch.items():
+                columns[name] += values
+    if columns is None:
+        # sin líneas: columnas vacías del tipo que da cada conversión
+        columns = convert_lines([], schema)
+    return columns
+
+
+def read_columns(path, schema, skip=0, workers=None):
+    """All the columns of ``path``; with ``workers`` > 1, in parallel
+    processes, each one reading its own range of lines"""
+    if not workers or workers < 2:
+        return merge_batches(iter_batches(path, schema, skip), schema)
+    ranges = chunk_ranges(path, workers, skip)
+    if not ranges:
+        return merge_batches([], schema)
+    with ProcessPoolExecutor(workers) as executor:
+        parts = executor.map(_read_range, *zip(*[(path, schema, start, end)
+                                                 for start, end in ranges]))
+        return merge_batches(parts, schema)
@@ -0,0 +1,74 @@
+import os
+import random
+import sys
+import tempfile
+import time
+from decimal import Decimal
+
+from fixed_width import (INVOICE, INVOICE_TEXT, SKU, DESCRIPTION, UNIT_PRICE,
+                         QUANTITY, ITEM_TOTAL, iter_batches, iter_records,
+                         read_columns)
+
+NUM_LINES = 10**6
+
+
+def write_invoice(path, size):
+    header, *lines = INVOICE_TEXT.splitlines()
+    rnd = random.Random(size)
+    with open(path, 'w') as fp:
+        fp.write(header + '\n')
+        for _ in range(size):
+            fp.write(rnd.choice(lines) + '\n')
+
+
+def naive(path):
+    # como en 4_slicing.py: una línea cada vez, campo a campo
+    records = []
+    with open(path) as fp:
+        next(fp)
+        for line in fp:
+            records.append((int(line[SKU]), line[DESCRIPTION].strip(),
+                            Decimal(line[UNIT_PRICE].strip().lstrip('$')),
+                            int(line[QUANTITY]),
+                            Decimal(line[ITEM_TOTAL].strip().lstrip('$'))))
+    return records
+
+
+def cents_of(records):
+    return [(sku, description, int(price * 100), quantity, int(total * 100))
+            for sku, description, price, quantity, total in records]
+
+
+def timed(label, size, function):
+    t0 = time.perf_counter()
+    result = function()
+    seconds = time.perf_counter() - t0
+    print('{:>22} | {:8.3f} | {:12,.0f}'.format(label, seconds, size / seconds))
+    return result
+
+
+def main(size):
+    path = os.path.join(tempfile.mkdtemp(), 'invoice.txt')
+    write_invoice(path, size)
+    print('{:,} lines, {:,} bytes'.format(size, os.path.getsize(path)))
+    print('{:>22} | {:>8} | {:>12}'.format('reader', 'seconds', 'rows/s'))
+    expected = cents_of(timed('naive line by line', size,
+                              lambda: naive(path)))
+    batches = timed('iter_batches', size,
+                    lambda: list(iter_batches(path, INVOICE, skip=1)))
+    assert [row for batch in batches
+            for row in zip(*batch.values())] == expected
+    del batches
+    records = timed('iter_records', size,
+                    lambda: list(iter_records(path, INVOICE, skip=1)))
+    assert records == expected
+    del records
+    for workers in (None, 2, 4):
+        columns = timed('read_columns({})'.format(workers), size,
+                        lambda: read_columns(path, INVOICE, 1, workers))
+        assert list(zip(*columns.values())) == expected
+    os.remove(path)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else NUM_LINES)
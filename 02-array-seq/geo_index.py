@@ -0,0 +1,210 @@
+"""
+Grid index over ``(name, cc, pop, (lat, lon))`` records like ``metro_areas``
+
+Latitudes and longitudes live in two ``array('d')`` columns; the records are
+grouped by cells of ``cell`` degrees, so a query only looks at the points of
+the cells it touches::
+
+    >>> metro_areas = [
+    ...     ('Tokyo', 'JP', 36.933, (35.689722, 139.691667)),
+    ...     ('Delhi NCR', 'IN', 21.935, (28.613889, 77.208889)),
+    ...     ('Mexico City', 'MX', 20.142, (19.433333, -99.133333)),
+    ...     ('New York-Newark', 'US', 20.104, (40.808611, -74.020386)),
+    ...     ('Sao Paulo', 'BR', 19.649, (-23.547778, -46.635833)),
+    ... ]
+    >>> index = GeoIndex(metro_areas)
+    >>> [name for name, *_ in index.bbox(-90, -180, 90, 0)]
+    ['Mexico City', 'New York-Newark', 'Sao Paulo']
+    >>> [(round(km), name) for km, (name, *_) in index.radius(19.4, -99.1, 50)]
+    [(5, 'Mexico City')]
+    >>> [(round(km), name) for km, (name, *_) in index.nearest(0, 0, 2)]
+    [(5670, 'Sao Paulo'), (8670, 'New York-Newark')]
+
+A box whose west edge is greater than its east edge crosses the 180th
+meridian::
+
+    >>> [name for name, *_ in index.bbox(0, 100, 90, -80)]
+    ['Tokyo', 'Mexico City']
+
+The cell size needn't divide 360: the column next to the 180th meridian is
+just narrower, and ``nearest`` gives the same points as a linear scan::
+
+    >>> import random
+    >>> rnd = random.Random(3000)
+    >>> points = [(str(i), 'XX', 1.0, (rnd.uniform(-90, 90),
+    ...                                rnd.uniform(-180, 180)))
+    ...           for i in range(3000)]
+    >>> def scan(lat, lon, k):
+    ...     return sorted(haversine(lat, lon, *record[3])
+    ...                   for record in points)[:k]
+    >>> all([km for km, _ in GeoIndex(points, cell).nearest(lat, lon, 50)]
+    ...     == scan(lat, lon, 50)
+    ...     for cell in (17, 25, 100) for lat, lon in
+    ...     [(26.86, -180), (26.86, 179.9), (-80, 170), (0, 0)])
+    True
+"""
+
+import heapq
+import math
+from array import array
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    """Great circle distance in km"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = (math.sin((phi2 - phi1) / 2) ** 2 + math.cos(phi1) * math.cos(phi2) *
+         math.sin(math.radians(lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class GeoIndex:
+
+    def __init__(self, records, cell=1.0):
+        self.records = list(records)
+        self.cell = cell
+        self.rows = math.ceil(180 / cell)
+        self.cols = math.ceil(360 / cell)
+        self.lats = array('d', (lat for *_, (lat, lon) in self.records))
+        self.lons = array('d', (lon for *_, (lat, lon) in self.records))
+        # los índices de los registros, ordenados por celda: cada celda es un
+        # tramo [start, end) de order
+        keys = [self._cell(lat, lon) for lat, lon in zip(self.lats, self.lons)]
+        self.order = array('L', sorted(range(len(keys)), key=keys.__getitem__))
+        self.cells = {}
+        for position, i in enumerate(self.order):
+            start, _ = self.cells.get(keys[i], (position, None))
+            self.cells[keys[i]] = (start, position + 1)
+
+    def __len__(self):
+        return len(self.records)
+
+    def _row(self, lat):
+        return min(self.rows - 1, max(0, int((lat + 90) // self.cell)))
+
+    def _col(self, lon):
+        return int((lon + 180) // self.cell) % self.cols
+
+    def _cell(self, lat, lon):
+        return self._row(lat), self._col(lon)
+
+    def _points(self, cells):
+        """Indexes of the records in ``cells``"""
+        order = self.order
+        for cell in cells:
+            span = self.cells.get(cell)
+            if span is not None:
+                yield from order[span[0]:span[1]]
+
+    def _box_cells(self, south, west, north, east):
+        rows = range(self._row(south), self._row(north) + 1)
+        first, last = self._col(west), self._col(east)
+        if east - west >= 360 or (west > east and last >= first):
+            cols = range(self.cols)
+        elif west > east or last < first:  # cruza el meridiano 180
+            cols = [*range(first, self.cols), *range(0, last + 1)]
+        else:
+            cols = range(first, last + 1)
+        return ((row, col) for row in rows for col in cols)
+
+    def _bbox_indexes(self, south, west, north, east):
+        lats, lons = self.lats, self.lons
+        crosses = west > east
+        for i in self._points(self._box_cells(south, west, north, east)):
+            lon = lons[i]
+            if south <= lats[i] <= north and (
+                    (lon >= west or lon <= east) if crosses
+                    else west <= lon <= east):
+                yield i
+
+    def bbox(self, south, west, north, east):
+        """Records inside the box, in the order they were given"""
+        return [self.records[i]
+                for i in sorted(self._bbox_indexes(south, west, north, east))]
+
+    def radius(self, lat, lon, km):
+        """``(distance, record)`` pairs within ``km`` of the point, nearest
+        first"""
+        dlat = km / KM_PER_DEGREE
+        south, north = max(-90.0, lat - dlat), min(90.0, lat + dlat)
+        widest = max(abs(south), abs(north))
+        if north >= 90 or south <= -90 or dlat >= 90:
+            west, east = -180.0, 180.0
+        else:
+            dlon = dlat / math.cos(math.radians(widest))
+            if dlon >= 180:
+                west, east = -180.0, 180.0
+            else:
+                west = (lon - dlon + 180) % 360 - 180
+                east = (lon + dlon + 180) % 360 - 180
+        found = []
+        for i in self._bbox_indexes(south, west, north, east):
+            distance = haversine(lat, lon, self.lats[i], self.lons[i])
+            if distance <= km:
+                found.append((distance, i))
+        found.sort()
+        return [(distance, self.records[i]) for distance, i in found]
+
+    def _ring(self, row, col, r):
+        """Cells at Chebyshev distance ``r`` of ``(row, col)``"""
+        if r == 0:
+            return {(row, col)}
+        ring = set()
+        width = min(2 * r + 1, self.cols)
+        for dcol in range(-r, -r + width):
+            for drow in (-r, r):
+                if 0 <= row + drow < self.rows:
+                    ring.add((row + drow, (col + dcol) % self.cols))
+        if 2 * r - 1 < self.cols:
+            for drow in range(-r + 1, r):
+                if 0 <= row + drow < self.rows:
+                    ring.add((row + drow, (col - r) % self.cols))
+                    ring.add((row + drow, (col + r) % self.cols))
+        return ring
+
+    def _width(self, col):
+        # si cell no divide a 360, la última columna es más estrecha
+        return min(self.cell, 360 - col * self.cell)
+
+    def _ring_bound(self, lat, lon, r):
+        """Lower bound in km for points outside the first ``r`` rings"""
+        row, col = self._cell(lat, lon)
+        # grados hasta el borde de los anillos, con el ancho real de cada
+        # fila y columna; sin más filas o columnas por ese lado no hay cota
+        south = lat + 90 - (row - r) * self.cell if row > r else math.inf
+        north = (min(180, (row + r + 1) * self.cell) - 90 - lat
+                 if row + r + 1 < self.rows else math.inf)
+        lat_bound = min(south, north) * KM_PER_DEGREE
+        if 2 * r + 1 >= self.cols:
+            return lat_bound
+        west = lon + 180 - col * self.cell + sum(
+            self._width((col - j) % self.cols) for j in range(1, r + 1))
+        east = self._width(col) - (lon + 180 - col * self.cell) + sum(
+            self._width((col + j) % self.cols) for j in range(1, r + 1))
+        # distancia al meridiano a gap grados: sin d = cos(lat) sin(gap)
+        gap = min(west, east, 90)
+        lon_bound = EARTH_RADIUS_KM * math.asin(
+            math.cos(math.radians(lat)) * math.sin(math.radians(gap)))
+        return min(lat_bound, lon_bound)
+
+    def nearest(self, lat, lon, k=1):
+        """The ``k`` nearest ``(distance, record)`` pairs, nearest first"""
+        row, col = self._cell(lat, lon)
+        best = []  # heap de (-distancia, i) con los k mejores
+        seen = set()
+        for r in range(max(self.rows, self.cols)):
+            ring = self._ring(row, col, r) - seen
+            seen |= ring
+            for i in self._points(ring):
+                distance = haversine(lat, lon, self.lats[i], self.lons[i])
+                if len(best) < k:
+                    heapq.heappush(best, (-distance, i))
+                elif distance < -best[0][0]:
+                    heapq.heapreplace(best, (-distance, i))
+            # el resto de anillos está a más de _ring_bound de distancia
+            if len(best) == k and -best[0][0] <= self._ring_bound(lat, lon, r):
+                break
+        return [(-distance, self.records[i]) for distance, i in
+                sorted(best, reverse=True)]
@@ -0,0 +1,70 @@
+import random
+import sys
+import time
+
+from geo_index import GeoIndex, haversine
+
+NUM_RECORDS = 10**6
+NUM_QUERIES = 100
+
+
+def make_records(size, rnd):
+    return [('city{}'.format(i), 'XX', rnd.uniform(0.1, 40),
+             (rnd.uniform(-60, 70), rnd.uniform(-180, 180)))
+            for i in range(size)]
+
+
+def scan_bbox(records, south, west, north, east):
+    return [record for record in records
+            if south <= record[3][0] <= north and west <= record[3][1] <= east]
+
+
+def scan_radius(records, lat, lon, km):
+    found = []
+    for record in records:
+        distance = haversine(lat, lon, *record[3])
+        if distance <= km:
+            found.append((distance, record))
+    found.sort()
+    return found
+
+
+def scan_nearest(records, lat, lon, k):
+    return sorted((haversine(lat, lon, *record[3]), record)
+                  for record in records)[:k]
+
+
+def timed(label, queries, index_query, scan_query, scan_queries):
+    t0 = time.perf_counter()
+    results = [index_query(*query) for query in queries]
+    indexed = (time.perf_counter() - t0) / len(queries)
+    # el recorrido lineal es lento: solo unas pocas consultas
+    t0 = time.perf_counter()
+    expected = [scan_query(*query) for query in queries[:scan_queries]]
+    scan = (time.perf_counter() - t0) / scan_queries
+    assert results[:scan_queries] == expected, label
+    print('{:>8} | {:12.3f} | {:12.3f} | {:8.0f}'.format(
+        label, indexed * 1e3, scan * 1e3, scan / indexed))
+
+
+def main(size):
+    rnd = random.Random(size)
+    records = make_records(size, rnd)
+    t0 = time.perf_counter()
+    index = GeoIndex(records)
+    print('{:,} records indexed in {:.2f}s'.format(
+        size, time.perf_counter() - t0))
+    points = [(rnd.uniform(-50, 60), rnd.uniform(-170, 170))
+              for _ in range(NUM_QUERIES)]
+    print('{:>8} | {:>12} | {:>12} | {:>8}'.format(
+        'query', 'index ms', 'scan ms', 'speedup'))
+    timed('bbox', [(lat, lon, lat + 2, lon + 3) for lat, lon in points],
+          index.bbox, lambda *box: scan_bbox(records, *box), 5)
+    timed('radius', [(lat, lon, 100) for lat, lon in points],
+          index.radius, lambda *q: scan_radius(records, *q), 3)
+    timed('nearest', [(lat, lon, 10) for lat, lon in points],
+          index.nearest, lambda *q: scan_nearest(records, *q), 3)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else NUM_RECORDS)
@@ -0,0 +1,16 @@
+# 34_regex_y_update_diccionario.py
+# Igual que 33_regex_y_update_diccionario.py, pero repartiendo el trabajo entre varios procesos
+# El archivo se parte en trozos (shards) que terminan en un salto de línea. Cada proceso indexa su trozo con WORD_RE en un defaultdict(list), y al final se juntan los índices parciales sumando a los números de línea de cada trozo las líneas de los trozos anteriores
+# Uso: python 34_regex_y_update_diccionario.py <archivo> [procesos]
+
+import sys
+
+from word_index import build_index_parallel, report
+
+if __name__ == '__main__':
+    # Con multiprocessing el código del proceso principal tiene que estar protegido con este if
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    index = build_index_parallel(sys.argv[1], workers)
+
+    # Recupera el diccionario ordenado
+    report(index)
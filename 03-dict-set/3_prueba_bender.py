@@ -156,7 +156,8 @@ from pydantic import BaseModel
 class Cliente(BaseModel):
     name: str
     vorname: str
-    alte: Optional[int]
+    # pydantic 2 ya no da None por defecto a los Optional
+    alte: Optional[int] = None
 
 
 class Contrato(BaseModel):
@@ -193,3 +194,8 @@ mapa = {
 }
 print(f"Valor transformado:{bend(mapa,cont1.dict())}")
 print(f"Valor transformado:{bend(mapa,cont2.dict())}")
+
+# Lee los atributos del modelo directamente, sin la copia de .dict()
+from bender_compiler import bend_compiled
+print(f"Valor transformado:{bend_compiled(mapa, cont1, attributes=True)}")
+print(f"Valor transformado:{bend_compiled(mapa, cont2, attributes=True)}")
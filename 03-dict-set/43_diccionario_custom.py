@@ -0,0 +1,152 @@
+"""StrKeyDict as a `dict` subclass: str keys take the C fast path of `dict`
+
+Test for initializer: keys are converted to `str`.
+
+    >>> d = StrKeyDict([(2, 'two'), ('4', 'four')])
+    >>> sorted(d.keys())
+    ['2', '4']
+
+Tests for item retrieval using `d[key]` notation::
+
+    >>> d['2']
+    'two'
+    >>> d[4]
+    'four'
+    >>> d[1]
+    Traceback (most recent call last):
+      ...
+    KeyError: '1'
+
+Tests for item retrieval using `d.get(key)` notation::
+
+    >>> d.get('2')
+    'two'
+    >>> d.get(4)
+    'four'
+    >>> d.get(1, 'N/A')
+    'N/A'
+
+Tests for the `in` operator::
+
+    >>> 2 in d
+    True
+    >>> 1 in d
+    False
+
+Test for item assignment using non-string key::
+
+    >>> d[0] = 'zero'
+    >>> d['0']
+    'zero'
+
+Tests for update using a `dict` or a sequence of pairs::
+
+    >>> d.update({6:'six', '8':'eight'})
+    >>> sorted(d.keys())
+    ['0', '2', '4', '6', '8']
+    >>> d.update([(10, 'ten'), ('12', 'twelve')])
+    >>> sorted(d.keys())
+    ['0', '10', '12', '2', '4', '6', '8']
+    >>> d.update([1, 3, 5])  # doctest: +IGNORE_EXCEPTION_DETAIL
+    Traceback (most recent call last):
+      ...
+    TypeError: 'int' object is not iterable
+
+A failed update leaves no key without converting::
+
+    >>> d.update([(1, 'one'), 5])  # doctest: +IGNORE_EXCEPTION_DETAIL
+    Traceback (most recent call last):
+      ...
+    TypeError: cannot unpack non-iterable int object
+    >>> sorted(d.keys())
+    ['0', '10', '12', '2', '4', '6', '8']
+
+Tests for `fromkeys` and `copy`::
+
+    >>> e = StrKeyDict.fromkeys(range(3), 0)
+    >>> e, type(e.copy()).__name__
+    ({'0': 0, '1': 0, '2': 0}, 'StrKeyDict')
+"""
+from collections.abc import Mapping
+from operator import itemgetter
+
+_STR_ONLY = {str}
+#Los métodos de dict en variables globales se llaman más rápido que dict.x
+_dict_setitem = dict.__setitem__
+_dict_contains = dict.__contains__
+_dict_get = dict.get
+
+
+#Subclase de dict: d[key], len, iter... con claves str no pasan por Python
+class StrKeyDict(dict):
+
+    #Conversión de una clave
+    _key = str
+
+    def __init__(self, other=(), **kwargs):
+        super().__init__()
+        self.update(other, **kwargs)
+
+    #Solo llegamos aquí si la clave no está: es el camino lento
+    def __missing__(self, key):
+        if isinstance(key, str):
+            raise KeyError(key)
+        return self[self._key(key)]
+
+    def __setitem__(self, key, item):
+        _dict_setitem(self, key if type(key) is str else self._key(key), item)
+
+    def __delitem__(self, key):
+        dict.__delitem__(self, key if type(key) is str else self._key(key))
+
+    #Todas las claves son str, así que basta con una búsqueda
+    def __contains__(self, key):
+        return _dict_contains(self,
+                              key if type(key) is str else self._key(key))
+
+    def get(self, key, default=None):
+        return _dict_get(self, key if type(key) is str else self._key(key),
+                         default)
+
+    def pop(self, key, *default):
+        return dict.pop(self, key if type(key) is str else self._key(key),
+                        *default)
+
+    def setdefault(self, key, default=None):
+        return dict.setdefault(
+            self, key if type(key) is str else self._key(key), default)
+
+    #Actualización en bloque: si todas las claves son str, dict.update en C
+    def update(self, other=(), **kwargs):
+        if not isinstance(other, Mapping):
+            pairs = other if isinstance(other, list) else list(other)
+            try:
+                first = map(itemgetter(0), pairs)
+                str_keys = set(map(type, first)) <= _STR_ONLY
+            except (TypeError, LookupError):
+                str_keys = False
+            if not str_keys:
+                #Se convierten todas antes de insertar: un par mal formado
+                #da el error sin dejar claves sin convertir en el dict
+                key = self._key
+                pairs = [(k if type(k) is str else key(k), v)
+                         for k, v in pairs]
+            dict.update(self, pairs)
+            other = {}
+        if isinstance(other, dict) and set(map(type, other)) <= _STR_ONLY:
+            dict.update(self, other)
+        else:
+            dict.update(self, zip(map(self._key, other.keys()),
+                                  other.values()))
+        if kwargs:
+            dict.update(self, kwargs)
+
+    @classmethod
+    def fromkeys(cls, iterable, value=None):
+        d = cls()
+        dict.update(d, dict.fromkeys(map(d._key, iterable), value))
+        return d
+
+    def copy(self):
+        return type(self)(self)
+
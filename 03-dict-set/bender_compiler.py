@@ -0,0 +1,539 @@
+"""
+Mapping compiler for jsonbender.
+
+``bend(mapping, source)`` walks the tree of benders of ``mapping`` for each
+record. ``compile_mapping`` walks it once and generates the source of a
+single function, where selectors become plain subscripts, constants become
+names and operators become Python operators::
+
+    >>> from jsonbender import bend, K, S, F, OptionalS
+    >>> MAPPING = {
+    ...     'fullName': (S('customer', 'first_name') + K(' ') +
+    ...                  S('customer', 'last_name')),
+    ...     'city': S('address', 'city'),
+    ...     'zip': OptionalS('address', 'zip', default='n/a'),
+    ...     'age': S('customer', 'age') >> F(int),
+    ... }
+    >>> source = {'customer': {'first_name': 'Inigo', 'last_name': 'Montoya',
+    ...                        'age': '24'},
+    ...           'address': {'city': 'Sicily', 'country': 'Florin'}}
+    >>> bend_compiled(MAPPING, source)
+    {'fullName': 'Inigo Montoya', 'city': 'Sicily', 'zip': 'n/a', 'age': 24}
+    >>> bend_compiled(MAPPING, source) == bend(MAPPING, source)
+    True
+
+Subpaths shared by several selectors, like ``S('customer')`` above, are
+looked up once per record::
+
+    >>> print(compile_mapping(MAPPING).source)  # doctest: +NORMALIZE_WHITESPACE
+    def _bend(v, c):
+        try:
+            _p0 = v['customer']
+        except Exception as e:
+            _p0 = _Missing(e)
+        try:
+            _p1 = v['address']
+        except Exception as e:
+            _p1 = _Missing(e)
+        try:
+            return {'fullName': ((_p0['first_name'] + ' ') + _p0['last_name']),
+            'city': _p1['city'], 'zip': _optional(_p1, _k9, _k0),
+            'age': _f1(_p0['age'])}
+        except Exception:
+            return _bend_slow(v, c)
+    <BLANKLINE>
+
+``bend_many`` bends an iterable of records lazily, one at a time, so it runs
+in constant memory over unbounded inputs such as ``iter_jsonlines(fp)``::
+
+    >>> import io
+    >>> lines = io.StringIO('{"address": {"city": "Paris", "zip": "75001"}, '
+    ...                     '"customer": {"first_name": "Ana", '
+    ...                     '"last_name": "Gil", "age": "31"}}\\n\\n')
+    >>> records = bend_many(MAPPING, iter_jsonlines(lines))
+    >>> next(records)['zip']
+    '75001'
+    >>> list(records)
+    []
+
+Compiled mappings are cached by the identity of the mapping, so they must
+not be changed after the first use. Only the last ``CACHE_SIZE`` mappings
+used are kept: a mapping built anew on each call (a dict literal inside a
+function) is compiled on each call, so define mappings once, at module
+level::
+
+    >>> for i in range(CACHE_SIZE + 10):
+    ...     _ = bend_compiled({'n': K(i)}, {})
+    >>> len(_cache) == CACHE_SIZE
+    True
+
+Errors are reported as ``bend`` does; to find the failing key the record is
+bent again key by key, so functions given to ``F`` may run twice for a
+failing record::
+
+    >>> bend_compiled(MAPPING, {'customer': {}})
+    Traceback (most recent call last):
+      ...
+    jsonbender.core.BendingException: Error for key fullName: 'first_name'
+
+With ``attributes=True`` selectors read attributes instead of keys, so
+validated model objects (pydantic, dataclasses...) can be bent directly::
+
+    >>> from types import SimpleNamespace as NS
+    >>> contract = NS(nummer=1234, kunde=NS(name='Eugenio', alte=None),
+    ...               extra={'color': 'red'})
+    >>> bend_compiled({'contrato': S('nummer'), 'nombre': S('kunde', 'name'),
+    ...                'edad': OptionalS('kunde', 'edad', default='n/a')},
+    ...               contract, attributes=True)
+    {'contrato': 1234, 'nombre': 'Eugenio', 'edad': 'n/a'}
+
+The compiled code reads every identifier key as an attribute. A mapping
+inside the object, like a ``dict`` field of a model, makes that fail, and
+the record is bent again key by key, reading keys from mappings and
+attributes from the rest. It works, but those records take the slow path::
+
+    >>> bend_compiled({'color': S('extra', 'color'), 'contrato': S('nummer')},
+    ...               contract, attributes=True)
+    {'color': 'red', 'contrato': 1234}
+
+``validate_many`` validates a whole list of raw dicts in one pydantic call.
+
+Benders the compiler doesn't know about run through their own
+``raw_execute``, so any custom bender keeps working.
+"""
+
+import collections
+import functools
+import json
+import keyword
+import re
+from collections.abc import Mapping
+from itertools import repeat
+
+from jsonbender import Bender, BendingException, Context, F, K, OptionalS, S
+from jsonbender.control_flow import Alternation, If, Switch
+from jsonbender.core import (Add, And, Compose, Div, Eq, GetItem, Invert, Mul,
+                             Ne, Neg, Or, Sub, Transport)
+from jsonbender.list_ops import Filter, FlatForall, Forall, ForallBend, Reduce
+from jsonbender.selectors import ProtectedF
+
+try:
+    from pydantic import TypeAdapter
+except ImportError:  # pydantic 1.x, o sin pydantic
+    TypeAdapter = None
+
+# marca que se sustituye por la expresión del valor de entrada
+VALUE = '\0v\0'
+# las rutas de S y OptionalS se escriben como VALUE\0s<n>\0 y VALUE\0o<n>\0
+PATH_TOKEN_RE = re.compile('\0[so][0-9]+\0')
+ROOTED_PATH_RE = re.compile(re.escape(VALUE) + '(\0[so][0-9]+\0)')
+# lo que puede ir antes del valor sin evaluar nada que falle: nombres,
+# números, paréntesis y comas (las palabras clave se miran aparte)
+LEADING_NAMES_RE = re.compile(r'[\w(, ]*')
+
+BINARY_OPERATORS = {
+    Add: '({} + {})',
+    Sub: '({} - {})',
+    Mul: '({} * {})',
+    Eq: '({} == {})',
+    Ne: '({} != {})',
+    # jsonbender evalúa siempre los dos lados, también en and/or
+    Div: '_div({}, {})',
+    And: '_and({}, {})',
+    Or: '_or({}, {})',
+}
+
+LIST_OPERATORS = {
+    Forall: '_list(_map({}, {}))',
+    Filter: '_list(_filter({}, {}))',
+    FlatForall: '_flat({}, {})',
+    Reduce: '_reduce({}, {})',
+}
+
+
+def _optional(value, path, default):
+    try:
+        for key in path:
+            value = value[key]
+    except LookupError:
+        return default
+    return value
+
+
+def _lookup(value, path):
+    # atributos, salvo en los diccionarios que cuelgan del objeto
+    for key in path:
+        if _is_attribute(key) and not isinstance(value, Mapping):
+            value = getattr(value, key)
+        else:
+            value = value[key]
+    return value
+
+
+def _optional_attr(value, path, default):
+    try:
+        return _lookup(value, path)
+    except (LookupError, AttributeError):
+        return default
+
+
+def _is_attribute(key):
+    return (type(key) is str and key.isidentifier() and
+            not keyword.iskeyword(key))
+
+
+def _evaluated_first(expr):
+    """True if the single ``VALUE`` of ``expr`` is the first thing that
+    runs when ``expr`` is evaluated"""
+    prefix = expr.partition(VALUE)[0]
+    return (LEADING_NAMES_RE.fullmatch(prefix) is not None and
+            not any(map(keyword.iskeyword, re.findall(r'\w+', prefix))))
+
+
+class _Missing:
+    """Shared prefix whose lookup failed; using it raises the same error"""
+
+    __slots__ = ('exc',)
+
+    def __init__(self, exc):
+        self.exc = exc
+
+    def __getitem__(self, key):
+        raise self.exc
+
+
+def _div(value1, value2):
+    return float(value1) / float(value2)
+
+
+def _and(value1, value2):
+    return value1 and value2
+
+
+def _or(value1, value2):
+    return value1 or value2
+
+
+def _flat(func, values):
+    return [item for value in values for item in func(value)]
+
+
+def _forall_bend(function, values, context):
+    return [function(value, context) for value in values]
+
+
+def _reduce(func, values):
+    try:
+        return functools.reduce(func, values)
+    except TypeError as e:  # lista vacía sin valor inicial
+        raise ValueError(e.args[0])
+
+
+def _alternation(functions, value):
+    exc = ValueError()
+    for function in functions:
+        try:
+            return function(value, {})
+        except LookupError as e:
+            exc = e
+    raise exc
+
+
+def _switch(key_function, cases, default, value):
+    key = key_function(value, {})
+    try:
+        function = cases[key]
+    except LookupError:
+        if default:
+            function = default
+        else:
+            raise
+    return function(value, {})
+
+
+class CompiledMapping:
+    """Callable ``(source, context=None)`` built by ``compile_mapping``"""
+
+    def __init__(self, mapping, attributes=False):
+        self.mapping = mapping
+        self.attributes = attributes
+        # al repetir un registro clave a clave, S con _lookup (ver _slow)
+        self._mixed = False
+        self._namespace = {
+            '_optional': _optional, '_optional_attr': _optional_attr,
+            '_lookup': _lookup, '_div': _div, '_and': _and, '_or': _or,
+            '_flat': _flat, '_reduce': _reduce, '_list': list, '_map': map,
+            '_filter': filter, '_alternation': _alternation,
+            '_switch': _switch, '_Missing': _Missing,
+            '_forall_bend': _forall_bend, '_Transport': Transport,
+        }
+        self._counter = 0
+        self._paths = {}
+        self.source = self._function(mapping, '_bend')
+        self._bend = self._namespace['_bend']
+
+    def __call__(self, source, context=None):
+        return self._bend(source, {} if context is None else context)
+
+    def _temporary(self):
+        self._counter += 1
+        return '_t{}'.format(self._counter - 1)
+
+    def _name(self, prefix, value):
+        name = '_{}{}'.format(prefix, self._counter)
+        self._counter += 1
+        self._namespace[name] = value
+        return name
+
+    def _constant(self, value):
+        # str e int se escriben tal cual en el código; el resto por nombre
+        if type(value) is str or type(value) is int and value >= 0:
+            return repr(value)
+        return self._name('k', value)
+
+    def _function(self, mapping, name):
+        """Define the function ``name(v, c)`` that bends ``mapping``"""
+        if isinstance(mapping, dict):
+            body = ('    try:\n'
+                    '        return {{{}}}\n'
+                    '    except Exception:\n'
+                    '        return {}_slow(v, c)\n').format(
+                ', '.join('{}: {}'.format(self._constant(key),
+                                          self._expr(value))
+                          for key, value in mapping.items()), name)
+            self._namespace[name + '_slow'] = self._slow(mapping)
+        else:
+            body = '    return {}\n'.format(self._expr(mapping))
+        source = 'def {}(v, c):\n{}'.format(name, self._hoist(body))
+        exec(source, self._namespace)
+        return source
+
+    def _path_token(self, kind, path):
+        token = '\0{}{}\0'.format(kind, len(self._paths))
+        self._paths[token] = path
+        return token
+
+    def _hoist(self, body):
+        """Replace the path tokens of ``body``, computing once the prefixes
+        shared by two or more paths that start at ``v``"""
+        rooted = {}
+        for match in ROOTED_PATH_RE.finditer(body):
+            token = match.group(1)
+            rooted[token] = self._paths[token]
+        counts = collections.Counter(
+            path[:size] for path in rooted.values()
+            for size in range(1, len(path)))
+        shared = sorted((prefix for prefix, count in counts.items()
+                         if count > 1), key=len)
+        hoisted = {(): 'v'}
+        lines = []
+        for prefix in shared:
+            base, rest = self._longest_prefix(prefix, hoisted)
+            name = hoisted[prefix] = '_p{}'.format(len(hoisted) - 1)
+            lines.append('    try:\n'
+                         '        {} = {}{}\n'
+                         '    except Exception as e:\n'
+                         '        {} = _Missing(e)\n'.format(
+                             name, base, self._render_path('\0s', rest),
+                             name))
+
+        def rooted_path(match):
+            token = match.group(1)
+            base, rest = self._longest_prefix(rooted[token], hoisted)
+            return base + self._render_path(token, rest)
+
+        def path(match):
+            token = match.group(0)
+            return self._render_path(token, self._paths[token])
+
+        body = ROOTED_PATH_RE.sub(rooted_path, body)
+        body = PATH_TOKEN_RE.sub(path, body)
+        return (''.join(lines) + body).replace(VALUE, 'v')
+
+    def _render_path(self, token, keys):
+        # S: subíndices o atributos; OptionalS: la ruta como argumento
+        if token[1] == 's':
+            return ''.join(
+                '.' + key if self.attributes and _is_attribute(key)
+                else '[{}]'.format(self._constant(key)) for key in keys)
+        return ', ' + self._name('k', keys)
+
+    def _longest_prefix(self, path, hoisted):
+        for size in range(len(path) - 1, 0, -1):
+            if path[:size] in hoisted:
+                return hoisted[path[:size]], path[size:]
+        return VALUE, path
+
+    def _slow(self, mapping):
+        """Key by key evaluation, only used to report errors like ``bend``
+
+        With ``attributes`` its selectors also read keys from mappings.
+        """
+        mixed, self._mixed = self._mixed, self.attributes
+        try:
+            functions = [(key, self._namespace[self._function_name(value)])
+                         for key, value in mapping.items()]
+        finally:
+            self._mixed = mixed
+
+        def slow(v, c):
+            result = {}
+            for key, function in functions:
+                try:
+                    result[key] = function(v, c)
+                except Exception as e:
+                    m = 'Error for key {}: {}'.format(key, str(e))
+                    raise BendingException(m)
+            return result
+        return slow
+
+    def _function_name(self, mapping):
+        name = self._name('m', None)
+        self._function(mapping, name)
+        return name
+
+    def _call(self, function_name, value, context):
+        return '{}({}, {})'.format(function_name, value, context)
+
+    def _expr(self, bender, value=VALUE, context='c'):
+        """Python expression with the result of ``bender``"""
+        expr = self._bender_expr(bender, context)
+        if value == VALUE or value.isidentifier():
+            return expr.replace(VALUE, value)
+        if VALUE not in expr:
+            # hay que evaluar el valor aunque no se use (puede fallar)
+            return '({}, {})[1]'.format(value, expr)
+        if expr.count(VALUE) > 1 or not _evaluated_first(expr):
+            # como en jsonbender, el valor se calcula una vez y antes que
+            # el resto: no puede quedar en una rama de un if sin evaluar
+            name = self._temporary()
+            return '({} := {}, {})[1]'.format(
+                name, value, expr.replace(VALUE, name))
+        return expr.replace(VALUE, value)
+
+    def _bender_expr(self, bender, context):
+        if isinstance(bender, dict):
+            return self._call(self._function_name(bender), VALUE, context)
+        if isinstance(bender, list):
+            return '[{}]'.format(', '.join(self._expr(item, VALUE, context)
+                                           for item in bender))
+        if not isinstance(bender, Bender):
+            return self._constant(bender)
+        kind = type(bender)
+        if kind is S and self._mixed:
+            return '_lookup({}, {})'.format(VALUE,
+                                            self._name('k', bender._path))
+        if kind is S:
+            return VALUE + self._path_token('s', bender._path)
+        if kind is OptionalS:
+            return '{}({}{}, {})'.format(
+                '_optional_attr' if self.attributes else '_optional',
+                VALUE, self._path_token('o', bender._path),
+                self._name('k', bender.default))
+        if kind is K:
+            return self._constant(bender._val)
+        if kind is Context:
+            return context
+        if kind is GetItem:
+            return '{}[{}]'.format(VALUE, self._constant(bender._index))
+        if kind is F and not bender._args and not bender._kwargs:
+            return '{}({})'.format(self._name('f', bender._func), VALUE)
+        if kind in (F, ProtectedF):
+            return '{}({})'.format(self._name('f', bender.execute), VALUE)
+        if kind is Compose:
+            first = self._expr(bender._first, VALUE, context)
+            return self._expr(bender._second, first, context)
+        if kind in BINARY_OPERATORS:
+            return BINARY_OPERATORS[kind].format(
+                self._expr(bender._bender1, VALUE, context),
+                self._expr(bender._bender2, VALUE, context))
+        if kind is Neg:
+            return '(-{})'.format(self._expr(bender.bender, VALUE, context))
+        if kind is Invert:
+            return '(not {})'.format(self._expr(bender.bender, VALUE, context))
+        # If, Switch, Alternation y las operaciones de listas ejecutan sus
+        # benders con el valor solo: el contexto se pierde, como en jsonbender
+        if kind is If:
+            return '({} if {} else {})'.format(
+                self._expr(bender.when_true, VALUE, '{}'),
+                self._expr(bender.condition, VALUE, '{}'),
+                self._expr(bender.when_false, VALUE, '{}'))
+        if kind is Alternation:
+            functions = [self._namespace[self._function_name(item)]
+                         for item in bender.benders]
+            return '_alternation({}, {})'.format(
+                self._name('k', functions), VALUE)
+        if kind is Switch and isinstance(bender.cases, dict):
+            key = self._namespace[self._function_name(bender.key_bender)]
+            cases = {case: self._namespace[self._function_name(item)]
+                     for case, item in bender.cases.items()}
+            default = (self._namespace[self._function_name(bender.default)]
+                       if bender.default else None)
+            return '_switch({}, {}, {}, {})'.format(
+                self._name('k', key), self._name('k', cases),
+                self._name('k', default), VALUE)
+        if kind in LIST_OPERATORS and bender._bender is None:
+            return LIST_OPERATORS[kind].format(
+                self._name('f', bender._func), VALUE)
+        if kind is ForallBend and bender._context is None:
+            # con una llamada y no una comprensión: el iterable puede llevar
+            # un := y eso no se admite en el iterable de una comprensión
+            return '_forall_bend({}, {}, {})'.format(
+                self._function_name(bender._mapping), VALUE, context)
+        # cualquier otro bender se ejecuta con su propio código
+        return '{}(_Transport({}, {}))'.format(
+            self._name('b', bender), VALUE, context)
+
+
+# caché LRU: cada entrada mantiene vivo su mapping
+CACHE_SIZE = 256
+_cache = collections.OrderedDict()
+
+
+def compile_mapping(mapping, attributes=False):
+    """Compiled version of ``mapping``, cached by ``id(mapping)``.
+
+    With ``attributes=True`` the string keys of the selectors that are valid
+    identifiers are read as attributes: ``S('kunde', 'name')`` becomes
+    ``v.kunde.name``, which works on model objects without a ``.dict()`` copy.
+    """
+    key = (id(mapping), attributes)
+    entry = _cache.get(key)
+    if entry is None or entry.mapping is not mapping:
+        entry = _cache[key] = CompiledMapping(mapping, attributes)
+        if len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    _cache.move_to_end(key)
+    return entry
+
+
+def bend_compiled(mapping, source, context=None, attributes=False):
+    """Same as ``jsonbender.bend``, using the compiled mapping"""
+    return compile_mapping(mapping, attributes)(source, context)
+
+
+def bend_many(mapping, records, context=None, attributes=False):
+    """Lazy iterator with the result of bending each record of ``records``"""
+    bend_one = compile_mapping(mapping, attributes)._bend
+    return map(bend_one, records, repeat({} if context is None else context))
+
+
+@functools.lru_cache(maxsize=None)
+def _list_adapter(model):
+    return TypeAdapter(list[model])
+
+
+def validate_many(model, records):
+    """Validate a list of dicts as ``model`` instances in a single call"""
+    if TypeAdapter is not None:
+        return _list_adapter(model).validate_python(records)
+    from typing import List
+    from pydantic import parse_obj_as
+    return parse_obj_as(List[model], records)
+
+
+def iter_jsonlines(fp):
+    """Records of a JSON-lines file, skipping blank lines"""
+    for line in fp:
+        if line.strip():
+            yield json.loads(line)
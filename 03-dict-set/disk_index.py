@@ -0,0 +1,333 @@
+"""
+Persistent word index stored in binary segment files opened with ``mmap``.
+
+A segment holds the index of a range of lines of one source file::
+
+    header  magic, version, byte order, word count, postings count
+    Q[n+1]  offsets of each word in the vocabulary blob
+    Q[n+1]  offsets of the postings of each word (in pairs)
+    bytes   vocabulary, UTF-8 words sorted as bytes
+    I[2*m]  postings, interleaved line and column
+
+Looking up a word is a binary search over the vocabulary; nothing but the
+pages touched by the search is read from disk, and the postings come back as
+a ``memoryview`` over the mapped file::
+
+    >>> import os, tempfile
+    >>> tmp = tempfile.mkdtemp()
+    >>> log = os.path.join(tmp, 'app.log')
+    >>> with open(log, 'w', encoding='utf-8') as fp:
+    ...     _ = fp.write('start server\\nserver ready\\n')
+    >>> index = DiskIndex(os.path.join(tmp, 'index'))
+    >>> index.update(log)
+    2
+    >>> index.lookup('server')
+    {'app.log': [(1, 7), (2, 1)]}
+
+``update`` only indexes the lines added since the last call, in a new
+segment, and ``compact`` merges the segments of each source::
+
+    >>> with open(log, 'a', encoding='utf-8') as fp:
+    ...     _ = fp.write('stop server\\nhalf a li')
+    >>> index.update(log)
+    1
+    >>> index.lookup('server', 'app.log')
+    [(1, 7), (2, 1), (3, 6)]
+    >>> len(index.segments), index.compact(), len(index.segments)
+    (2, 1, 1)
+    >>> index.close()
+    >>> with DiskIndex(os.path.join(tmp, 'index')) as index:
+    ...     index.lookup('server'), index.lookup('nothing')
+    ({'app.log': [(1, 7), (2, 1), (3, 6)]}, {})
+
+The unfinished last line is left for the next ``update``. A file that
+shrank or whose first bytes changed (e.g. a rotated log) is indexed again
+from the start; its old segments are deleted once the new manifest is
+saved::
+
+    >>> with open(log, 'w', encoding='utf-8') as fp:
+    ...     _ = fp.write('rotated')
+    >>> with DiskIndex(os.path.join(tmp, 'index')) as index:
+    ...     index.update(log), index.segments, index.lookup('server')
+    (0, [], {})
+    >>> DiskIndex(os.path.join(tmp, 'index')).lookup('server')
+    {}
+"""
+
+import bisect
+import itertools
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+
+from word_index import CompactIndex, Postings
+
+MAGIC = b'WIDX'
+VERSION = 1
+HEADER = struct.Struct('<4sHHIIQ')
+BYTE_ORDERS = {'little': 0, 'big': 1}
+HEAD_SIZE = 4096
+MANIFEST = 'manifest.json'
+
+
+def write_segment(path, index):
+    """Write ``index`` (a mapping word -> (line, column) pairs) to ``path``"""
+    words = sorted((word.encode('utf-8'), word) for word in index)
+    word_offsets = array('Q', [0])
+    posting_offsets = array('Q', [0])
+    postings = array('I')
+    for encoded, word in words:
+        word_offsets.append(word_offsets[-1] + len(encoded))
+        postings.extend(itertools.chain.from_iterable(index[word]))
+        posting_offsets.append(len(postings) // 2)
+    vocabulary = b''.join(encoded for encoded, _ in words)
+    header = HEADER.pack(MAGIC, VERSION, BYTE_ORDERS[sys.byteorder],
+                         len(words), 0, len(postings) // 2)
+    with open(path, 'wb') as fp:
+        fp.write(header)
+        word_offsets.tofile(fp)
+        posting_offsets.tofile(fp)
+        fp.write(vocabulary)
+        # los postings van alineados a 4 bytes para poder hacer cast('I')
+        fp.write(b'\0' * (-fp.tell() % postings.itemsize))
+        postings.tofile(fp)
+
+
+class _Vocabulary:
+    """Sequence of the encoded words of a segment, for ``bisect``"""
+
+    def __init__(self, octets, offsets):
+        self._octets = octets
+        self._offsets = offsets
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, position):
+        return bytes(self._octets[self._offsets[position]:
+                                  self._offsets[position + 1]])
+
+
+class Segment:
+    """Read only, memory mapped segment file"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as fp:
+            self._mmap = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        memv = self._memv = memoryview(self._mmap)
+        magic, version, byte_order, words, _, pairs = HEADER.unpack_from(memv)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError('{!r} is not a word index segment'.format(path))
+        if byte_order != BYTE_ORDERS[sys.byteorder]:
+            raise ValueError('{!r} was written with a different byte order'
+                             .format(path))
+        start = HEADER.size
+        end = start + (words + 1) * 8
+        self._word_offsets = memv[start:end].cast('Q')
+        start, end = end, end + (words + 1) * 8
+        self._posting_offsets = memv[start:end].cast('Q')
+        start, end = end, end + self._word_offsets[-1]
+        self._words = memv[start:end]
+        self._vocabulary = _Vocabulary(self._words, self._word_offsets)
+        start = end + (-end % 4)
+        self._postings = memv[start:start + pairs * 8].cast('I')
+
+    def __len__(self):
+        return len(self._vocabulary)
+
+    def __iter__(self):
+        for position in range(len(self)):
+            yield self._vocabulary[position].decode('utf-8')
+
+    def lookup(self, word):
+        """Return the ``Postings`` of ``word`` (a view over the file) or ``None``"""
+        key = word.encode('utf-8')
+        vocabulary = self._vocabulary
+        position = bisect.bisect_left(vocabulary, key)
+        if position == len(vocabulary) or vocabulary[position] != key:
+            return None
+        first = self._posting_offsets[position] * 2
+        last = self._posting_offsets[position + 1] * 2
+        return Postings(self._postings[first:last])
+
+    def close(self):
+        # hay que soltar las memoryview antes de cerrar el mmap; los
+        # Postings devueltos por lookup también tienen que estar liberados
+        self._vocabulary = None
+        for name in ('_word_offsets', '_posting_offsets', '_postings',
+                     '_words', '_memv'):
+            getattr(self, name).release()
+        self._mmap.close()
+
+
+def _complete_lines(fp, consumed):
+    """Complete lines of ``fp`` from where it is, split as in text mode;
+    adds the bytes and lines read to ``consumed``"""
+    for raw in fp:
+        if not raw.endswith(b'\n'):
+            break  # la última línea está a medias
+        text = raw.decode('utf-8')
+        if '\r' in text:
+            # saltos universales, como TextIOWrapper: \r\n y \r solo
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+            lines = [line + '\n' for line in text[:-1].split('\n')]
+        else:
+            lines = [text]
+        consumed[0] += len(raw)
+        consumed[1] += len(lines)
+        yield from lines
+
+
+class DiskIndex:
+    """Directory of segments plus a ``manifest.json`` describing them"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        try:
+            with open(os.path.join(directory, MANIFEST),
+                      encoding='utf-8') as fp:
+                self._manifest = json.load(fp)
+        except FileNotFoundError:
+            self._manifest = {'next_segment': 1, 'sources': {}}
+        self._open = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def segments(self):
+        return [name for source in self._manifest['sources'].values()
+                for name in source['segments']]
+
+    def _segment(self, name):
+        segment = self._open.get(name)
+        if segment is None:
+            segment = Segment(os.path.join(self.directory, name))
+            self._open[name] = segment
+        return segment
+
+    def _save(self):
+        path = os.path.join(self.directory, MANIFEST)
+        with open(path + '.tmp', 'w', encoding='utf-8') as fp:
+            json.dump(self._manifest, fp, indent=1)
+        # os.replace es atómico: nunca queda un manifest a medio escribir
+        os.replace(path + '.tmp', path)
+
+    def _new_segment(self, index):
+        name = 'seg-{:06d}.widx'.format(self._manifest['next_segment'])
+        self._manifest['next_segment'] += 1
+        write_segment(os.path.join(self.directory, name), index)
+        return name
+
+    def _drop(self, names):
+        for name in names:
+            segment = self._open.pop(name, None)
+            if segment is not None:
+                segment.close()
+            os.remove(os.path.join(self.directory, name))
+
+    def update(self, path, name=None):
+        """Index the complete lines of ``path`` not indexed yet.
+
+        Returns the number of lines added.
+        """
+        name = name or os.path.basename(path)
+        stale = []
+        with open(path, 'rb') as fp:
+            size = fp.seek(0, os.SEEK_END)
+            state = self._manifest['sources'].get(name)
+            if state is not None:
+                # si el principio del archivo ha cambiado, es otro archivo
+                fp.seek(0)
+                head = zlib.crc32(fp.read(min(state['offset'], HEAD_SIZE)))
+                if size < state['offset'] or head != state['head']:
+                    # se borran después de guardar el manifest nuevo
+                    stale = state['segments']
+                    state = None
+            if state is None:
+                state = {'offset': 0, 'lines': 0, 'head': 0, 'segments': []}
+                self._manifest['sources'][name] = state
+            fp.seek(state['offset'])
+            consumed = [0, 0]
+            index = CompactIndex.from_lines(_complete_lines(fp, consumed),
+                                            state['lines'] + 1)
+            added_bytes, added_lines = consumed
+            if added_lines:
+                state['segments'].append(self._new_segment(index))
+                state['offset'] += added_bytes
+                state['lines'] += added_lines
+                fp.seek(0)
+                state['head'] = zlib.crc32(
+                    fp.read(min(state['offset'], HEAD_SIZE)))
+        self._save()
+        self._drop(stale)
+        return added_lines
+
+    def lookup(self, word, source=None):
+        """Locations of ``word``, in one source or as ``{source: list}``"""
+        if source is not None:
+            names = self._manifest['sources'][source]['segments']
+            return [location for name in names
+                    for location in self._segment(name).lookup(word) or ()]
+        found = {}
+        for source in self._manifest['sources']:
+            locations = self.lookup(word, source)
+            if locations:
+                found[source] = locations
+        return found
+
+    def compact(self):
+        """Merge the segments of every source; returns segments written"""
+        written = 0
+        for state in self._manifest['sources'].values():
+            if len(state['segments']) < 2:
+                continue
+            index = CompactIndex()
+            for name in state['segments']:
+                segment = self._segment(name)
+                for word in segment:
+                    for line_no, column_no in segment.lookup(word):
+                        index.add(word, line_no, column_no)
+            old = state['segments']
+            state['segments'] = [self._new_segment(index)]
+            written += 1
+            self._save()
+            self._drop(old)
+        return written
+
+    def close(self):
+        for segment in self._open.values():
+            segment.close()
+        self._open.clear()
+
+
+def main(argv):
+    if len(argv) < 2 or argv[0] not in ('update', 'lookup', 'compact'):
+        print('Usage: disk_index.py update <index-dir> <file>...\n'
+              '       disk_index.py lookup <index-dir> <word>...\n'
+              '       disk_index.py compact <index-dir>')
+        return 1
+    command, directory, *args = argv
+    with DiskIndex(directory) as index:
+        if command == 'update':
+            for path in args:
+                print(path, index.update(path), 'new lines')
+        elif command == 'lookup':
+            for word in args:
+                print(word, index.lookup(word))
+        else:
+            print(index.compact(), 'segments written')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
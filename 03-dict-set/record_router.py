@@ -0,0 +1,228 @@
+"""
+Rule engine for mapping patterns, indexed by their literal values.
+
+``get_creators`` in ``2_patterns.py`` tries each ``case`` in order. A
+``Router`` takes the same rules as (pattern, handler) pairs, where a pattern
+is a dict of literals, ``Capture`` and ``CaptureList`` (``[*name]``), and
+indexes them by their literal values in nested dict tables. Routing a record
+is a few dict lookups plus the full check of the candidates, which are tried
+in the original order, so the first matching rule wins as in ``match``::
+
+    >>> def invalid_book(record):
+    ...     raise ValueError(f"Invalid 'book' record: {record!r}")
+    >>> def invalid(record):
+    ...     raise ValueError(f'Invalid record: {record!r}')
+    >>> get_creators = Router([
+    ...     ({'type': 'book', 'api': 2, 'authors': CaptureList('names')},
+    ...      lambda record, names: names),
+    ...     ({'type': 'book', 'api': 1, 'author': Capture('name')},
+    ...      lambda record, name: [name]),
+    ...     ({'type': 'book'}, invalid_book),
+    ...     ({'type': 'movie', 'director': Capture('name')},
+    ...      lambda record, name: [name]),
+    ...     (ANY, invalid),
+    ... ])
+    >>> get_creators({'api': 1, 'author': 'Douglas Hofstadter', 'type': 'book'})
+    ['Douglas Hofstadter']
+    >>> get_creators({'api': 2, 'type': 'book', 'authors': ('Martelli', 'Holden')})
+    ['Martelli', 'Holden']
+    >>> get_creators({'type': 'movie', 'director': 'Kurosawa', 'api': 1})
+    ['Kurosawa']
+    >>> get_creators({'type': 'book', 'pages': 770})
+    Traceback (most recent call last):
+      ...
+    ValueError: Invalid 'book' record: {'type': 'book', 'pages': 770}
+    >>> get_creators('Spam, spam, spam')
+    Traceback (most recent call last):
+      ...
+    ValueError: Invalid record: 'Spam, spam, spam'
+
+Literals compare as in ``match``: ``None``, ``True`` and ``False`` by
+identity (they are not indexed, since ``True`` and ``1`` share a hash) and
+the rest with ``==``, so ``1.0`` routes like ``1``.
+"""
+
+import collections
+from collections.abc import Mapping, Sequence
+
+# tipos de literal que se pueden usar como clave de las tablas
+INDEXABLE = (str, int, float, complex, bytes)
+_MISSING = object()
+# reglas sin literal en la clave que se copian en cada rama; con más, se
+# comparten y sus candidatos se mezclan al buscar
+COPY_REST = 4
+
+
+class Capture:
+    """Matches any value and binds it to ``name`` (``_`` when ``None``)"""
+
+    __slots__ = ('name',)
+
+    def __init__(self, name=None):
+        self.name = name
+
+    def __repr__(self):
+        return 'Capture({!r})'.format(self.name)
+
+
+class CaptureList(Capture):
+    """Matches a sequence that is not a string, like ``[*name]``"""
+
+    __slots__ = ()
+
+    def __repr__(self):
+        return 'CaptureList({!r})'.format(self.name)
+
+
+ANY = Capture()
+
+
+def match_pattern(pattern, value, captures):
+    """True if ``value`` matches ``pattern``, adding the bound names to
+    ``captures``"""
+    if type(pattern) is dict:
+        if not isinstance(value, Mapping):
+            return False
+        for key, item_pattern in pattern.items():
+            item = value.get(key, _MISSING)
+            if item is _MISSING or not match_pattern(item_pattern, item,
+                                                     captures):
+                return False
+        return True
+    if type(pattern) is CaptureList:
+        if (not isinstance(value, Sequence) or
+                isinstance(value, (str, bytes, bytearray))):
+            return False
+        captures[pattern.name] = list(value)
+        return True
+    if type(pattern) is Capture:
+        if pattern.name is not None:
+            captures[pattern.name] = value
+        return True
+    if pattern is None or pattern is True or pattern is False:
+        return value is pattern
+    return value == pattern
+
+
+def _indexable(value):
+    return type(value) in INDEXABLE
+
+
+class _Node:
+    __slots__ = ('key', 'table', 'rest', 'shared')
+
+    def __init__(self, key, table, rest, shared):
+        self.key = key
+        self.table = table
+        self.rest = rest
+        self.shared = shared
+
+
+def _build(rules, used):
+    """Decision tree over ``rules``, a list of (order, pattern, handler)
+
+    The rules without a literal at the key of a node are copied into its
+    branches only when there are at most ``COPY_REST``; otherwise the
+    branches leave them out and lookups merge them back, so the tree grows
+    polynomially, not exponentially, with the rules.
+    """
+    counts = collections.Counter(
+        key for _, pattern, _ in rules if type(pattern) is dict
+        for key, value in pattern.items()
+        if key not in used and _indexable(value))
+    if len(rules) < 2 or not counts:
+        return rules
+    # la clave que aparece en más reglas es la que más candidatos descarta
+    key = counts.most_common(1)[0][0]
+    keyed = {}
+    rest = []
+    for rule in rules:
+        pattern = rule[1]
+        value = pattern.get(key, _MISSING) if type(pattern) is dict else None
+        if _indexable(value):
+            keyed.setdefault(value, []).append(rule)
+        else:
+            rest.append(rule)
+    used = used | {key}
+    # pocas reglas en rest: se copian en cada rama, en su orden original, y
+    # la búsqueda sigue un solo camino. Con muchas, copiarlas en cada rama
+    # hace crecer el árbol exponencialmente: rest se construye una vez
+    shared = len(rest) > COPY_REST
+    table = {value: _build(bucket if shared else
+                           sorted(bucket + rest, key=lambda rule: rule[0]),
+                           used)
+             for value, bucket in keyed.items()}
+    return _Node(key, table, _build(rest, used), shared)
+
+
+def _lookup(node, record):
+    """(order, pattern, handler) of the candidates for ``record``, in order"""
+    while type(node) is _Node:
+        try:
+            branch = node.table.get(record.get(node.key, _MISSING))
+        except TypeError:  # valor no hashable: no es ningún literal
+            branch = None
+        if branch is None:
+            node = node.rest
+        elif node.shared:
+            found = _lookup(branch, record)
+            rest = _lookup(node.rest, record)
+            if not found or not rest:
+                return found or rest
+            # el orden de cada regla es único: no se llegan a comparar
+            # los patrones
+            return sorted(found + rest)
+        else:
+            node = branch
+    return node
+
+
+class Router:
+    """Ordered (pattern, handler) rules dispatched through hash tables"""
+
+    def __init__(self, rules=()):
+        self._rules = []
+        self._root = None
+        for pattern, handler in rules:
+            self.add(pattern, handler)
+
+    def add(self, pattern, handler):
+        self._rules.append((len(self._rules), pattern, handler))
+        self._root = None
+
+    def __len__(self):
+        return len(self._rules)
+
+    def _tree(self):
+        if self._root is None:
+            self._root = _build(self._rules, frozenset())
+            # los registros que no son Mapping solo pueden casar con Capture
+            self._others = [rule for rule in self._rules
+                            if type(rule[1]) is not dict]
+        return self._root
+
+    def _candidates(self, record):
+        node = self._tree()
+        if not isinstance(record, Mapping):
+            return self._others
+        return _lookup(node, record)
+
+    def candidates(self, record):
+        """Rules that may match ``record``, in their original order"""
+        return [(pattern, handler)
+                for _, pattern, handler in self._candidates(record)]
+
+    def match(self, record):
+        """``(handler, captures)`` of the first matching rule, or ``None``"""
+        for _, pattern, handler in self._candidates(record):
+            captures = {}
+            if match_pattern(pattern, record, captures):
+                return handler, captures
+        return None
+
+    def __call__(self, record):
+        found = self.match(record)
+        if found is None:
+            raise ValueError('no rule matches {!r}'.format(record))
+        handler, captures = found
+        return handler(record, **captures)
@@ -0,0 +1,92 @@
+"""
+Cost of bending pydantic models with and without the ``.dict()`` copy
+
+Uses the ``Contrato`` mapping of ``3_prueba_bender.py`` on ``records`` raw
+dicts and times each pipeline from the raw dicts to the bent results.
+
+Usage: python bender_models_perftest.py [records]
+"""
+import os
+import sys
+import timeit
+from typing import Optional
+
+from jsonbender import bend, K, S, OptionalS
+from jsonbender.control_flow import If
+from pydantic import BaseModel
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bender_compiler import bend_many, validate_many  # noqa: E402
+
+NUM_RECORDS = 100_000
+REPEAT = 5
+
+
+# los modelos de 3_prueba_bender.py, que no se puede importar (es un script
+# y su nombre empieza por un dígito)
+class Cliente(BaseModel):
+    name: str
+    vorname: str
+    alte: Optional[int] = None
+
+
+class Contrato(BaseModel):
+    nummer: int
+    kunde: Cliente
+
+
+alte_ = If(S('kunde', 'alte') == K(None), K('n/a'), S('kunde', 'alte'))
+mapa = {
+    'nombre': S('kunde', 'name'),
+    'apellido': S('kunde', 'vorname'),
+    'contrato': S('nummer'),
+    'edad': alte_,
+    'edad bis': OptionalS('kunde', 'alte', default='n/a'),
+}
+
+
+def as_dict(model):
+    # pydantic 2 renombra .dict() a .model_dump()
+    dump = getattr(model, 'model_dump', None) or model.dict
+    return dump()
+
+
+def raw_records(size):
+    return [{'nummer': i, 'kunde': {'name': 'Eugenio',
+                                    'vorname': 'Garcia San Martin',
+                                    'alte': i % 90 if i % 3 else None}}
+            for i in range(size)]
+
+
+PIPELINES = [
+    ('validate + .dict() + bend', lambda raw: [
+        bend(mapa, as_dict(Contrato(**record))) for record in raw]),
+    ('validate + .dict() + compiled', lambda raw: list(bend_many(
+        mapa, (as_dict(Contrato(**record)) for record in raw)))),
+    ('validate_many + .dict() + compiled', lambda raw: list(bend_many(
+        mapa, map(as_dict, validate_many(Contrato, raw))))),
+    ('validate_many + attributes', lambda raw: list(bend_many(
+        mapa, validate_many(Contrato, raw), attributes=True))),
+]
+
+
+def main(records):
+    raw = raw_records(records)
+    expected = [bend(mapa, record) for record in raw]
+    print('{:>36} | {:>8} | {:>10}'.format('pipeline', 'seconds', 'records/s'))
+    for name, pipeline in PIPELINES:
+        assert pipeline(raw) == expected, name
+        elapsed = min(timeit.repeat(lambda: pipeline(raw), number=1,
+                                    repeat=REPEAT))
+        print('{:>36} | {:8.3f} | {:10,.0f}'.format(
+            name, elapsed, records / elapsed))
+    # solo la copia: lo que se ahorra leyendo atributos
+    models = validate_many(Contrato, raw)
+    elapsed = min(timeit.repeat(lambda: list(map(as_dict, models)),
+                                number=1, repeat=REPEAT))
+    print('{:>36} | {:8.3f} |'.format('.dict() alone', elapsed))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else NUM_RECORDS)
@@ -0,0 +1,157 @@
+"""
+``bend()`` vs compiled mappings on the examples of ``3_prueba_bender.py``
+
+Also times ``bend_many`` over a list of records and checks that bending a
+JSON-lines stream keeps the memory flat.
+
+Usage: python bender_perftest.py [records]
+"""
+import json
+import math
+import os
+import sys
+import tempfile
+import timeit
+import tracemalloc
+from itertools import repeat
+
+from jsonbender import (bend, BendingException, K, S, OptionalS, F, Reduce,
+                        Filter, Forall, Context)
+from jsonbender.control_flow import If, Switch, Alternation
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bender_compiler import bend_compiled, bend_many, iter_jsonlines  # noqa: E402,E501
+
+NUM_RECORDS = 100_000
+
+alte_ = If(S('kunde', 'alte') == K(None), K('n/a'), S('kunde', 'alte'))
+
+# (nombre, mapping, registro, contexto) con los ejemplos de 3_prueba_bender.py
+EXAMPLES = [
+    ('basico', {
+        'fullName': (S('customer', 'first_name') + K(' ') +
+                     S('customer', 'last_name')),
+        'city': S('address', 'city'),
+    }, {
+        'customer': {'first_name': 'Inigo', 'last_name': 'Montoya', 'Age': 24},
+        'address': {'city': 'Sicily', 'country': 'Florin'},
+    }, None),
+    ('indices', {'val': S('a', 'deeply', 'nested', 0, 'value')},
+     {'a': {'deeply': {'nested': [{'value': 42}]}}}, None),
+    ('optional', {'val': OptionalS('does', 'not', 'exist', default=27)},
+     {'does': {'exist': 23}}, None),
+    ('funciones', {
+        'total_number_of_keys': F(len),
+        'number_of_str_keys': F(lambda source: len(
+            [k for k in source.keys() if isinstance(k, str)])),
+        'price_truncated': S('price_as_str') >> F(float) >> F(int),
+    }, {'price_as_str': '42.2', 'k1': 'v', 1: 'a'}, None),
+    ('protect', {'sqrt': S('val') >> F(math.sqrt).protect(-1)},
+     {'val': -1}, None),
+    ('operandos', {'add': S('a') + S('b'), 'sub': S('a') - S('b'),
+                   'mul': S('a') * S('b'), 'div': S('a') / S('b')},
+     {'a': 10, 'b': 5}, None),
+    ('listas', {'suma': S('ints') >> Reduce(lambda acc, i: acc + i),
+                'pares': S('ints') >> Filter(lambda i: i % 2 == 0),
+                'dobles': S('ints') >> Forall(lambda i: i * 2)},
+     {'ints': [1, 4, 7, 9]}, None),
+    ('control', {
+        'alt': Alternation(S(1), S(0), S('key1')),
+        'if': If(S('country') == K('China'), S('first_name'),
+                 S('last_name')),
+        'switch': Switch(S('service'), {
+            'twitter': S('handle'),
+            'mastodon': S('handle') + K('@') + S('server')},
+            default=S('email')),
+    }, {'country': 'Brazil', 'first_name': 'Gustavo', 'last_name': 'Kuerten',
+        'service': 'mastodon', 'handle': 'etandel', 'key1': 23,
+        'server': 'mastodon.social'}, None),
+    ('contexto', {'name': S('name'),
+                  'age': (Context() >> S('year')) - S('birthyear')},
+     {'name': 'Mary', 'birthyear': 1990}, {'year': 2016}),
+    ('forall', {'r': (S('a') >> (S('x') + S('y')) >>
+                      Forall.bend({'q': S('z')}))},
+     {'a': {'x': [{'z': 1}], 'y': [{'z': 2}]}}, None),
+    ('if', {'m': S('a') >> If(K(True), K(1), S('b'))}, {'a': {}}, None),
+    ('eq', {'m': S('a') >> ((Context() >> S('z')) == S('b'))},
+     {'a': {'b': 1}}, {'z': 1}),
+    ('contrato', {
+        'nombre': S('kunde', 'name'),
+        'apellido': S('kunde', 'vorname'),
+        'contrato': S('nummer'),
+        'edad': alte_,
+        'edad bis': OptionalS('kunde', 'alte', default='n/a'),
+    }, {'nummer': 1234, 'kunde': {'name': 'Eugenio',
+                                  'vorname': 'Garcia San Martin',
+                                  'alte': None}}, None),
+]
+
+
+# (mapping, registro, contexto) que fallan: el error debe ser el de bend,
+# aunque el valor compuesto solo se use en una rama que no se evalúa
+ERROR_EXAMPLES = [
+    ({'m': S('a') >> If(K(True), K(1), S('b'))}, {}, None),
+    ({'m': S('a') >> ((Context() >> S('z')) == S('b'))}, {}, {}),
+]
+
+
+def error(function, *args):
+    try:
+        function(*args)
+    except BendingException as e:
+        return str(e)
+    return None
+
+
+def main(records):
+    for mapping, source, context in ERROR_EXAMPLES:
+        message = error(bend, mapping, source, context)
+        assert message and error(bend_compiled, mapping, source,
+                                 context) == message, message
+    print('{:>10} | {:>10} | {:>10} | {:>7}'.format(
+        'mapping', 'bend us', 'compiled', 'speedup'))
+    for name, mapping, source, context in EXAMPLES:
+        assert bend_compiled(mapping, source, context) == bend(
+            mapping, source, context), name
+        slow = min(timeit.repeat(lambda: bend(mapping, source, context),
+                                 number=records, repeat=3))
+        fast = min(timeit.repeat(
+            lambda: bend_compiled(mapping, source, context),
+            number=records, repeat=3))
+        print('{:>10} | {:10.3f} | {:10.3f} | {:7.1f}'.format(
+            name, slow / records * 1e6, fast / records * 1e6, slow / fast))
+    print('\n{:>10} | {:>10} | {:>10} | {:>7}'.format(
+        'mapping', 'bend loop', 'bend_many', 'speedup'))
+    for name, mapping, source, context in EXAMPLES:
+        batch = [source] * records
+        slow = min(timeit.repeat(
+            lambda: [bend(mapping, item, context) for item in batch],
+            number=1, repeat=3))
+        fast = min(timeit.repeat(
+            lambda: list(bend_many(mapping, batch, context)),
+            number=1, repeat=3))
+        print('{:>10} | {:9.3f}s | {:9.3f}s | {:7.1f}'.format(
+            name, slow, fast, slow / fast))
+    stream_memory(records)
+
+
+def stream_memory(records):
+    """Peak memory bending a JSON-lines stream of growing length"""
+    name, mapping, source, context = EXAMPLES[-1]
+    line = json.dumps(source) + '\n'
+    print('\n{:>10} | {:>12}'.format('lines', 'peak bytes'))
+    for size in (records // 100, records // 10, records):
+        with tempfile.TemporaryFile('w+', encoding='utf-8') as fp:
+            fp.writelines(repeat(line, size))
+            fp.seek(0)
+            tracemalloc.start()
+            for _ in bend_many(mapping, iter_jsonlines(fp), context):
+                pass
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        print('{:10,d} | {:12,d}'.format(size, peak))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else NUM_RECORDS)
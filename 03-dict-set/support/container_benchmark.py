@@ -0,0 +1,179 @@
+"""
+Container ``in`` operator benchmark suite
+
+Times membership tests for several containers and haystack sizes in one
+run, using the ``selected.arr``/``not_selected.arr`` files written by
+``container_perftest_datagen.py``, and reports min/median/p99 time per
+repetition plus the memory taken by each haystack.
+
+Usage: python container_benchmark.py [-h] [--containers NAME ...]
+           [--max-exponent N] [--repeat N] [--json FILE] [--csv FILE]
+"""
+import argparse
+import array
+import bisect
+import csv
+import json
+import math
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+try:
+    import numpy
+except ImportError:  # los contenedores de NumPy son opcionales
+    numpy = None
+
+NEEDLES = 500
+
+
+def contains_loop(haystack, needles):
+    found = 0
+    for n in needles:
+        if n in haystack:
+            found += 1
+    return found
+
+
+def contains_bisect(haystack, needles):
+    found = 0
+    size = len(haystack)
+    for n in needles:
+        i = bisect.bisect_left(haystack, n)
+        if i < size and haystack[i] == n:
+            found += 1
+    return found
+
+
+def contains_isin(haystack, needles):
+    return int(numpy.isin(needles, haystack).sum())
+
+
+def contains_searchsorted(haystack, needles):
+    positions = numpy.searchsorted(haystack, needles)
+    positions[positions == len(haystack)] = 0
+    return int((haystack[positions] == needles).sum())
+
+
+def as_numpy(values):
+    return numpy.frombuffer(values, dtype=numpy.float64).copy()
+
+
+# nombre -> (construye el haystack, prepara las needles, búsqueda)
+CONTAINERS = {
+    'dict': (lambda sel: dict.fromkeys(sel, 1), list, contains_loop),
+    'set': (set, list, contains_loop),
+    'frozenset': (frozenset, list, contains_loop),
+    'list': (list, list, contains_loop),
+    'bisect': (lambda sel: array.array('d', sorted(sel)), list,
+               contains_bisect),
+    'numpy-isin': (as_numpy, as_numpy, contains_isin),
+    'numpy-searchsorted': (lambda sel: numpy.sort(as_numpy(sel)), as_numpy,
+                           contains_searchsorted),
+}
+
+# una búsqueda lineal en una lista de 10**7 elementos tarda demasiado
+MAX_EXPONENTS = {'list': 5}
+
+
+def load(size, selected_path, not_selected_path):
+    selected = array.array('d')
+    with open(selected_path, 'rb') as fp:
+        selected.fromfile(fp, size)
+    needles = array.array('d')
+    with open(not_selected_path, 'rb') as fp:
+        needles.fromfile(fp, NEEDLES)
+    needles.extend(selected[::max(1, size // NEEDLES)])
+    return selected, needles
+
+
+def measure(name, selected, needles, repeat):
+    build, prepare, lookup = CONTAINERS[name]
+    tracemalloc.start()
+    haystack = build(selected)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    needles = prepare(needles)
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        found = lookup(haystack, needles)
+        times.append(time.perf_counter() - t0)
+    # rango más cercano: siempre es un tiempo medido. quantiles() por
+    # defecto extrapola más allá del máximo con pocas repeticiones
+    p99 = sorted(times)[math.ceil(0.99 * len(times)) - 1]
+    return {
+        'container': name,
+        'size': len(selected),
+        'needles': len(needles),
+        'found': found,
+        'min': min(times),
+        'median': statistics.median(times),
+        'p99': p99,
+        'memory': memory,
+    }
+
+
+def run(args):
+    environment = {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'numpy': numpy.__version__ if numpy else None,
+    }
+    results = []
+    print('{:>18} | {:>9} | {:>10} | {:>10} | {:>10} | {:>12}'.format(
+        'container', 'size', 'min', 'median', 'p99', 'memory'))
+    for exponent in range(args.min_exponent, args.max_exponent + 1):
+        size = 10 ** exponent
+        selected, needles = load(size, args.selected, args.not_selected)
+        for name in args.containers:
+            if exponent > MAX_EXPONENTS.get(name, args.max_exponent):
+                continue
+            result = measure(name, selected, needles, args.repeat)
+            results.append(result)
+            print('{container:>18} | {size:9d} | {min:10.6f} | '
+                  '{median:10.6f} | {p99:10.6f} | {memory:12,d}'
+                  .format(**result))
+    if args.json:
+        with open(args.json, 'w') as fp:
+            json.dump({'environment': environment, 'results': results},
+                      fp, indent=2)
+    if args.csv:
+        with open(args.csv, 'w', newline='') as fp:
+            # sin resultados (todos los contenedores saltados) solo va la
+            # cabecera del entorno
+            fields = [*environment, *(results[0] if results else ())]
+            writer = csv.DictWriter(fp, fieldnames=fields)
+            writer.writeheader()
+            for result in results:
+                writer.writerow({**environment, **result})
+    return results
+
+
+def parse_args(argv):
+    available = [name for name in CONTAINERS
+                 if numpy is not None or not name.startswith('numpy')]
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--containers', nargs='+', default=available,
+                        choices=available)
+    parser.add_argument('--min-exponent', type=int, default=3)
+    parser.add_argument('--max-exponent', type=int, default=7)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--selected', default='selected.arr')
+    parser.add_argument('--not-selected', default='not_selected.arr')
+    parser.add_argument('--json', help='write the results as JSON')
+    parser.add_argument('--csv', help='write the results as CSV')
+    args = parser.parse_args(argv)
+    if not 0 <= args.min_exponent <= args.max_exponent:
+        parser.error('exponents must satisfy 0 <= --min-exponent <= '
+                     '--max-exponent')
+    if args.repeat < 1:
+        parser.error('--repeat must be at least 1')
+    return args
+
+
+if __name__ == '__main__':
+    run(parse_args(sys.argv[1:]))
@@ -1,37 +1,133 @@
 """
 Generate data for container performance test
+
+Without options the sample is built in memory as a ``set`` of
+``1/random.random()`` values and then shuffled. With ``--seed`` the same
+files are written in fixed size chunks, so peak memory does not depend on
+``MAX_EXPONENT`` and the output is byte-identical for a given seed (with or
+without ``--numpy``).
+
+Usage: python container_perftest_datagen.py [--seed N] [--numpy]
+           [--max-exponent N]
 """
 
+import argparse
 import random
 import array
 
 MAX_EXPONENT = 7
-HAYSTACK_LEN = 10 ** MAX_EXPONENT
-NEEDLES_LEN = 10 ** (MAX_EXPONENT - 1)
-SAMPLE_LEN = HAYSTACK_LEN + NEEDLES_LEN // 2
+CHUNK_LEN = 2 ** 16
+
+# Con --seed cada valor sale de un índice i, 0 <= i < SAMPLE_LEN, permutado
+# con una red de Feistel sobre 40 bits. La permutación es una biyección, así
+# que no hay duplicados ni hace falta un set para descartarlos, y el orden
+# resultante ya está barajado. Los valores 1/u con u = (k + 1) / 2**40 están
+# separados mucho más que el error de redondeo, así que siguen siendo
+# distintos como float.
+DOMAIN_BITS = 40
+HALF_BITS = DOMAIN_BITS // 2
+HALF_MASK = (1 << HALF_BITS) - 1
+WORD_MASK = 0xFFFFFFFF
+ROUNDS = 6
+SCALE = 2.0 ** -DOMAIN_BITS
+
+
+def round_keys(seed):
+    rnd = random.Random(seed)
+    return [rnd.getrandbits(32) for _ in range(ROUNDS)]
+
+
+def feistel(index, keys):
+    left, right = index >> HALF_BITS, index & HALF_MASK
+    for key in keys:
+        mixed = ((right ^ key) * 0x9E3779B1) & WORD_MASK
+        mixed ^= mixed >> 15
+        mixed = (mixed * 0x85EBCA6B) & WORD_MASK
+        left, right = right, left ^ (mixed & HALF_MASK)
+    return (left << HALF_BITS) | right
+
+
+def chunk_values(start, stop, keys):
+    return array.array('d', (1.0 / ((feistel(i, keys) + 1) * SCALE)
+                             for i in range(start, stop)))
+
+
+def chunk_values_numpy(start, stop, keys):
+    import numpy
+    index = numpy.arange(start, stop, dtype=numpy.uint64)
+    left, right = index >> HALF_BITS, index & HALF_MASK
+    for key in keys:
+        mixed = ((right ^ key) * 0x9E3779B1) & WORD_MASK
+        mixed ^= mixed >> 15
+        mixed = (mixed * 0x85EBCA6B) & WORD_MASK
+        left, right = right, left ^ (mixed & HALF_MASK)
+    values = 1.0 / ((((left << HALF_BITS) | right) + 1)
+                    .astype(numpy.float64) * SCALE)
+    return array.array('d', values.tobytes())
+
+
+def generate_streaming(max_exponent, seed, use_numpy=False):
+    haystack_len = 10 ** max_exponent
+    needles_len = 10 ** (max_exponent - 1)
+    sample_len = haystack_len + needles_len // 2
+    not_selected_len = needles_len // 2
+    keys = round_keys(seed)
+    make_chunk = chunk_values_numpy if use_numpy else chunk_values
+    print('streaming sample: %d elements, seed %d' % (sample_len, seed))
+    with open('not_selected.arr', 'wb') as not_selected, \
+            open('selected.arr', 'wb') as selected:
+        for start in range(0, sample_len, CHUNK_LEN):
+            stop = min(start + CHUNK_LEN, sample_len)
+            chunk = make_chunk(start, stop, keys)
+            # los primeros valores van a not_selected, igual que en el modo
+            # original
+            split = max(0, min(not_selected_len - start, len(chunk)))
+            if split:
+                chunk[:split].tofile(not_selected)
+            chunk[split:].tofile(selected)
+    print('not selected: %d samples' % not_selected_len)
+    print('selected: %d samples' % (sample_len - not_selected_len))
+
+
+def generate(max_exponent):
+    haystack_len = 10 ** max_exponent
+    needles_len = 10 ** (max_exponent - 1)
+    sample_len = haystack_len + needles_len // 2
+
+    sample = {1/random.random() for i in range(sample_len)}
+    print('initial sample: %d elements' % len(sample))
 
-needles = array.array('d')
+    # complete sample, in case duplicate random numbers were discarded
+    while len(sample) < sample_len:
+        sample.add(1/random.random())
 
-sample = {1/random.random() for i in range(SAMPLE_LEN)}
-print('initial sample: %d elements' % len(sample))
+    print('complete sample: %d elements' % len(sample))
 
-# complete sample, in case duplicate random numbers were discarded
-while len(sample) < SAMPLE_LEN:
-    sample.add(1/random.random())
+    sample = array.array('d', sample)
+    random.shuffle(sample)
 
-print('complete sample: %d elements' % len(sample))
+    not_selected = sample[:needles_len // 2]
+    print('not selected: %d samples' % len(not_selected))
+    print('  writing not_selected.arr')
+    with open('not_selected.arr', 'wb') as fp:
+        not_selected.tofile(fp)
 
-sample = array.array('d', sample)
-random.shuffle(sample)
+    selected = sample[needles_len // 2:]
+    print('selected: %d samples' % len(selected))
+    print('  writing selected.arr')
+    with open('selected.arr', 'wb') as fp:
+        selected.tofile(fp)
 
-not_selected = sample[:NEEDLES_LEN // 2]
-print('not selected: %d samples' % len(not_selected))
-print('  writing not_selected.arr')
-with open('not_selected.arr', 'wb') as fp:
-    not_selected.tofile(fp)
 
-selected = sample[NEEDLES_LEN // 2:]
-print('selected: %d samples' % len(selected))
-print('  writing selected.arr')
-with open('selected.arr', 'wb') as fp:
-    selected.tofile(fp)
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--seed', type=int,
+                        help='stream the sample in chunks from this seed')
+    parser.add_argument('--numpy', action='store_true',
+                        help='vectorize the streaming mode with NumPy')
+    parser.add_argument('--max-exponent', type=int, default=MAX_EXPONENT)
+    args = parser.parse_args()
+    if args.seed is None:
+        generate(args.max_exponent)
+    else:
+        generate_streaming(args.max_exponent, args.seed, args.numpy)
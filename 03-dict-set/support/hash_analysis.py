@@ -0,0 +1,204 @@
+"""
+Hash distribution analysis for millions of keys
+
+``hashdiff.py`` compares the bits of two hashes formatting them as binary
+strings. This module does the same kind of comparison in bulk: hashes are
+kept in an ``array('q')`` and bits are counted with ``bytes.translate`` and
+``bytes.count``, so every step runs in C over the whole array.
+
+    >>> hashes = bulk_hashes(range(1024))
+    >>> bit_balance(hashes)[:12]
+    [0.5, 0.5, 0.5, 0.5, 0.5, 0.5, 0.5, 0.5, 0.5, 0.5, 0.0, 0.0]
+    >>> bucket_stats(hashes, 2048)['collisions']
+    0
+    >>> bucket_stats(bulk_hashes([(i, i) for i in range(4096)]), 8192)
+    ... # doctest: +NORMALIZE_WHITESPACE
+    {'table_size': 8192, 'keys': 4096, 'buckets': 3921, 'collisions': 175,
+     'collision_rate': 0.042724609375}
+
+The hash used by ``Vector2d``, ``hash(x) ^ hash(y)``, sends every vector
+with ``x == y`` to the same bucket::
+
+    >>> xy = [float(i) for i in range(4096) for _ in range(2)]
+    >>> bucket_stats(vector2d_hashes(xy), 8192)['buckets']
+    1
+
+Usage: python hash_analysis.py (--arr FILE | --lines FILE) [--vector2d]
+           [--limit N] [--table-size N] [--probe-sample N]
+"""
+import argparse
+import math
+import operator
+import sys
+import time
+from array import array
+from itertools import repeat
+
+# como MAX_BITS de hashdiff, sin importarlo: hashdiff imprime al cargarse
+WORD_BITS = len(format(sys.maxsize, 'b')) + 1
+UNSIGNED = (1 << WORD_BITS) - 1
+PERTURB_SHIFT = 5
+# BIT_TABLES[b] convierte cada byte en el valor de su bit b: 0 o 1
+BIT_TABLES = [bytes((byte >> bit) & 1 for byte in range(256))
+              for bit in range(8)]
+
+
+def bulk_hashes(keys):
+    return array('q', map(hash, keys))
+
+
+def vector2d_hashes(values):
+    """Hashes of ``Vector2d(x, y)`` for consecutive pairs of ``values``"""
+    xs = bulk_hashes(values[0::2])
+    ys = bulk_hashes(values[1::2])
+    return xor_hashes(xs, ys)
+
+
+def xor_hashes(hashes1, hashes2):
+    # un XOR de dos enteros enormes recorre los dos arrays de una vez
+    size = len(hashes1) * hashes1.itemsize
+    xored = (int.from_bytes(hashes1.tobytes(), 'little') ^
+             int.from_bytes(hashes2.tobytes(), 'little'))
+    return array('q', xored.to_bytes(size, 'little'))
+
+
+def bit_counts(hashes):
+    """Number of hashes with each bit set, from bit 0 to the top bit"""
+    octets = hashes.tobytes()
+    counts = []
+    for bit in range(WORD_BITS):
+        byte = bit // 8 if sys.byteorder == 'little' else 7 - bit // 8
+        column = octets[byte::hashes.itemsize]
+        counts.append(column.translate(BIT_TABLES[bit % 8]).count(1))
+    return counts
+
+
+def bit_balance(hashes):
+    """Fraction of hashes with each bit set (0.5 is ideal)"""
+    return [count / len(hashes) for count in bit_counts(hashes)]
+
+
+def avalanche(hashes1, hashes2):
+    """Fraction of pairs in which each bit differs (0.5 is ideal)"""
+    return bit_balance(xor_hashes(hashes1, hashes2))
+
+
+def dict_table_size(keys):
+    """Size of the index table of a ``dict`` holding ``keys`` items"""
+    size = 8
+    while size * 2 // 3 < keys:
+        size *= 2
+    return size
+
+
+def bucket_stats(hashes, table_size):
+    """Collisions on the first probe in a table of ``table_size`` slots"""
+    mask = table_size - 1
+    buckets = len(set(map(operator.and_, hashes, repeat(mask))))
+    collisions = len(hashes) - buckets
+    return {
+        'table_size': table_size,
+        'keys': len(hashes),
+        'buckets': buckets,
+        'collisions': collisions,
+        'collision_rate': collisions / len(hashes),
+    }
+
+
+def probe_lengths(hashes, table_size):
+    """Probes needed to insert each hash, following CPython's dict probing"""
+    mask = table_size - 1
+    used = bytearray(table_size)
+    lengths = array('L')
+    for h in hashes:
+        perturb = h & UNSIGNED
+        i = perturb & mask
+        probes = 1
+        while used[i]:
+            perturb >>= PERTURB_SHIFT
+            i = (i * 5 + perturb + 1) & mask
+            probes += 1
+        used[i] = 1
+        lengths.append(probes)
+    return lengths
+
+
+def probe_stats(hashes, table_size):
+    lengths = probe_lengths(hashes, table_size)
+    load = len(hashes) / table_size
+    return {
+        'mean_probes': sum(lengths) / len(lengths),
+        'max_probes': max(lengths),
+        # sondeo uniforme ideal: (1/a) * ln(1/(1-a)) para una búsqueda con éxito
+        'uniform_probes': (math.log(1 / (1 - load)) / load) if load else 1.0,
+    }
+
+
+def load_keys(args):
+    if args.arr:
+        keys = array('d')
+        with open(args.arr, 'rb') as fp:
+            keys.frombytes(fp.read(args.limit * 8 if args.limit else -1))
+        return keys
+    with open(args.lines, encoding='utf-8') as fp:
+        keys = fp.read().splitlines()
+    return keys[:args.limit] if args.limit else keys
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--arr', help="array('d') file, e.g. selected.arr")
+    source.add_argument('--lines', help='text file, one str key per line')
+    parser.add_argument('--vector2d', action='store_true',
+                        help='hash consecutive values as Vector2d(x, y)')
+    parser.add_argument('--limit', type=int, help='use only the first keys')
+    parser.add_argument('--table-size', type=int,
+                        help='slots of the simulated table (power of 2)')
+    parser.add_argument('--probe-sample', type=int, default=10**6,
+                        help='keys used to simulate probing')
+    args = parser.parse_args(argv)
+    if args.vector2d and args.lines:
+        parser.error('--vector2d needs float coordinates: use it with --arr')
+
+    t0 = time.perf_counter()
+    keys = load_keys(args)
+    if args.vector2d:
+        hashes = vector2d_hashes(keys)
+        # vecino: el mismo vector con la y cambiada al siguiente float
+        xs = bulk_hashes(keys[0::2])
+        ys = bulk_hashes(map(math.nextafter, keys[1::2], repeat(math.inf)))
+        neighbours = xor_hashes(xs, ys)
+        kind = 'Vector2d hash(x) ^ hash(y), neighbour = next y'
+    else:
+        hashes = bulk_hashes(keys)
+        if isinstance(keys, array):
+            neighbours = bulk_hashes(map(math.nextafter, keys,
+                                         repeat(math.inf)))
+            kind = 'float, neighbour = next float'
+        else:
+            neighbours = hashes[1:] + hashes[:1]
+            kind = 'str, neighbour = next key'
+    print('{:,} keys ({}) hashed in {:.2f}s'.format(
+        len(hashes), kind, time.perf_counter() - t0))
+
+    balance = bit_balance(hashes)
+    flips = avalanche(hashes, neighbours)
+    print('\n bit | set ratio | flip ratio')
+    for bit, (ratio, flip) in enumerate(zip(balance, flips)):
+        warning = '  <--' if abs(flip - 0.5) > 0.1 and bit < 32 else ''
+        print('{:4d} | {:9.4f} | {:10.4f}{}'.format(bit, ratio, flip, warning))
+
+    table_size = args.table_size or dict_table_size(len(hashes))
+    stats = bucket_stats(hashes, table_size)
+    print('\ntable size {table_size:,}: {buckets:,} buckets used, '
+          '{collisions:,} collisions ({collision_rate:.2%})'.format(**stats))
+    sample = hashes[:args.probe_sample]
+    probes = probe_stats(sample, dict_table_size(len(sample)))
+    print('probes for {:,} keys: mean {mean_probes:.3f}, max {max_probes}, '
+          'uniform hashing {uniform_probes:.3f}'.format(len(sample), **probes))
+    print('elapsed: {:.2f}s'.format(time.perf_counter() - t0))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
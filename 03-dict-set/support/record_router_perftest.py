@@ -0,0 +1,143 @@
+"""
+``match`` statement vs ``Router`` as the number of rules grows
+
+For each size the same rules are written as the ``case`` clauses of a
+generated function (compiled with ``exec``) and as a ``Router``; both must
+return the same results for every record. The first table uses the
+``type``/``api`` keys of ``2_patterns.py``; the second spreads the rules
+over ``SPREAD_KEYS`` keys and also times building the router's tree. Its
+records have many keys, so ``match`` finds a rule among the first cases
+while the router still gathers every candidate: there the index doesn't pay.
+
+Usage: python record_router_perftest.py [records]
+"""
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from record_router import ANY, Capture, Router  # noqa: E402
+
+NUM_RECORDS = 10_000
+RULE_COUNTS = (4, 16, 64, 256, 1024)
+APIS = 4
+SPREAD_KEYS = 8
+
+
+def rule_keys(rules):
+    """(type, api) of each rule; the last api of each type has no api key"""
+    return [('type{}'.format(i // APIS), i % APIS) for i in range(rules)]
+
+
+def match_source(rules):
+    lines = ['def route(record):', '    match record:']
+    for i, (kind, api) in enumerate(rule_keys(rules)):
+        if api == APIS - 1:
+            lines.append('        case {{"type": {!r}, "title": title}}:'
+                         .format(kind))
+        else:
+            lines.append('        case {{"type": {!r}, "api": {}, '
+                         '"title": title}}:'.format(kind, api))
+        lines.append('            return ({}, title)'.format(i))
+    lines.append('        case _:')
+    lines.append('            return None')
+    return '\n'.join(lines)
+
+
+def build_match(rules):
+    namespace = {}
+    exec(match_source(rules), namespace)
+    return namespace['route']
+
+
+def spread_patterns(rules):
+    """One or two literal keys out of SPREAD_KEYS for each rule"""
+    rnd = random.Random(rules)
+    return [{'k{}'.format(rnd.randrange(SPREAD_KEYS)): rnd.randrange(4)
+             for _ in range(rnd.randint(1, 2))} for _ in range(rules)]
+
+
+def build_spread_match(patterns):
+    lines = ['def route(record):', '    match record:']
+    for i, pattern in enumerate(patterns):
+        lines.append('        case {}:'.format(pattern))
+        lines.append('            return {}'.format(i))
+    lines.append('        case _:')
+    lines.append('            return None')
+    namespace = {}
+    exec('\n'.join(lines), namespace)
+    return namespace['route']
+
+
+def make_spread_records(rules, size):
+    rnd = random.Random(-rules)
+    return [{'k{}'.format(rnd.randrange(SPREAD_KEYS)): rnd.randrange(4)
+             for _ in range(rnd.randint(1, SPREAD_KEYS))}
+            for _ in range(size)]
+
+
+def build_router(rules):
+    router = Router()
+    for i, (kind, api) in enumerate(rule_keys(rules)):
+        pattern = {'type': kind, 'title': Capture('title')}
+        if api != APIS - 1:
+            pattern['api'] = api
+        router.add(pattern, lambda record, title, i=i: (i, title))
+    router.add(ANY, lambda record: None)
+    return router
+
+
+def make_records(rules, size):
+    rnd = random.Random(rules)
+    records = []
+    for n in range(size):
+        kind = 'type{}'.format(rnd.randrange(rules // APIS + 1))
+        record = {'type': kind, 'api': rnd.randrange(APIS + 1),
+                  'title': 't{}'.format(n)}
+        if n % 7 == 0:
+            del record['title']
+        records.append(record)
+    return records
+
+
+def main(records):
+    print('{:>6} | {:>10} | {:>10} | {:>7}'.format(
+        'rules', 'match us', 'router us', 'speedup'))
+    for rules in RULE_COUNTS:
+        route_match = build_match(rules)
+        router = build_router(rules)
+        sample = make_records(rules, records)
+        assert [route_match(r) for r in sample] == [router(r) for r in sample]
+        slow = min(timeit.repeat(lambda: [route_match(r) for r in sample],
+                                 number=1, repeat=3))
+        fast = min(timeit.repeat(lambda: [router(r) for r in sample],
+                                 number=1, repeat=3))
+        print('{:6d} | {:10.3f} | {:10.3f} | {:7.1f}'.format(
+            rules, slow / records * 1e6, fast / records * 1e6, slow / fast))
+    print('\n{:>6} | {:>10} | {:>10} | {:>7} | {:>8}'.format(
+        'spread', 'match us', 'router us', 'speedup', 'build ms'))
+    for rules in RULE_COUNTS:
+        patterns = spread_patterns(rules)
+        route_match = build_spread_match(patterns)
+        router = Router([(pattern, lambda record, i=i: i)
+                         for i, pattern in enumerate(patterns)])
+        router.add(ANY, lambda record: None)
+        sample = make_spread_records(rules, records)
+        # el árbol se construye en la primera búsqueda
+        t0 = timeit.default_timer()
+        router.candidates({})
+        build = timeit.default_timer() - t0
+        assert [route_match(r) for r in sample] == [router(r) for r in sample]
+        slow = min(timeit.repeat(lambda: [route_match(r) for r in sample],
+                                 number=1, repeat=3))
+        fast = min(timeit.repeat(lambda: [router(r) for r in sample],
+                                 number=1, repeat=3))
+        print('{:6d} | {:10.3f} | {:10.3f} | {:7.1f} | {:8.1f}'.format(
+            rules, slow / records * 1e6, fast / records * 1e6, slow / fast,
+            build * 1e3))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else NUM_RECORDS)
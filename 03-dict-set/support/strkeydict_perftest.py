@@ -0,0 +1,73 @@
+"""
+StrKeyDict0 (41), StrKeyDict (42), the dict subclass of 43 and ``dict``
+
+Times the common operations with ``size`` keys; the numbered modules are
+loaded with ``importlib`` because their names are not identifiers.
+
+Usage: python strkeydict_perftest.py [size]
+"""
+import importlib
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+StrKeyDict0 = importlib.import_module('41_diccionario_custom').StrKeyDict0
+StrKeyDict = importlib.import_module('42_diccionario_custom').StrKeyDict
+custom = importlib.import_module('43_diccionario_custom')
+
+SIZE = 100_000
+CLASSES = [('dict', dict), ('41 StrKeyDict0', StrKeyDict0),
+           ('42 StrKeyDict', StrKeyDict), ('43 StrKeyDict', custom.StrKeyDict)]
+
+
+def operations(size):
+    int_keys = list(range(size))
+    str_keys = list(map(str, int_keys))
+    str_pairs = [(key, None) for key in str_keys]
+    int_pairs = [(key, None) for key in int_keys]
+    return [
+        # nombre, preparación (cls -> estado), operación (estado)
+        ('build str pairs', lambda cls: cls, lambda cls: cls(str_pairs)),
+        ('build int pairs', lambda cls: cls, lambda cls: cls(int_pairs)),
+        ('fromkeys int', lambda cls: cls, lambda cls: cls.fromkeys(int_keys)),
+        ('update int dict', lambda cls: (cls(), dict(int_pairs)),
+         lambda state: state[0].update(state[1])),
+        ('d[k] str', lambda cls: cls(str_pairs),
+         lambda d: [d[key] for key in str_keys]),
+        ('d[k] int', lambda cls: cls(str_pairs),
+         lambda d: [d[key] for key in int_keys]),
+        ('k in d str', lambda cls: cls(str_pairs),
+         lambda d: [key in d for key in str_keys]),
+        ('k in d int', lambda cls: cls(str_pairs),
+         lambda d: [key in d for key in int_keys]),
+        ('d[k] = v int', lambda cls: cls(),
+         lambda d: [d.__setitem__(key, None) for key in int_keys]),
+    ]
+
+
+def main(size):
+    names = [name for name, _ in CLASSES]
+    print('{:>16} | {}'.format('ms', ' | '.join(
+        '{:>14}'.format(name) for name in names)))
+    for op_name, prepare, operation in operations(size):
+        cells = []
+        for name, cls in CLASSES:
+            # dict y StrKeyDict0 no convierten claves int: no es comparable
+            if 'int' in op_name and cls in (dict, StrKeyDict0) and \
+                    op_name != 'd[k] int' and op_name != 'k in d int':
+                cells.append('{:>14}'.format('-'))
+                continue
+            try:
+                state = prepare(cls)
+                elapsed = min(timeit.repeat(lambda: operation(state),
+                                            number=1, repeat=7))
+                cells.append('{:14.2f}'.format(elapsed * 1e3))
+            except KeyError:  # dict no encuentra las claves int
+                cells.append('{:>14}'.format('KeyError'))
+        print('{:>16} | {}'.format(op_name, ' | '.join(cells)))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else SIZE)
@@ -0,0 +1,50 @@
+"""
+RAM used by the word index: list of tuples vs ``CompactIndex``
+
+Usage: python word_index_memtest.py <list|compact> [occurrences]
+
+Run once per representation, like ``09-pythonic-obj/mem_test.py``, so each
+``ru_maxrss`` reading comes from a clean process.
+"""
+import os
+import random
+import resource
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from word_index import CompactIndex, index_lines  # noqa: E402
+
+NUM_OCCURRENCES = 10**7
+WORDS_PER_LINE = 12
+VOCABULARY = ['w%d' % i for i in range(50_000)]
+
+
+def corpus(occurrences):
+    # generamos las líneas sobre la marcha para no ocupar memoria con el texto
+    rnd = random.Random(42)
+    for _ in range(occurrences // WORDS_PER_LINE):
+        yield ' '.join(rnd.choices(VOCABULARY, k=WORDS_PER_LINE))
+
+
+def main(kind, occurrences):
+    mem_init = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print('Indexing {:,} occurrences with {}'.format(occurrences, kind))
+    if kind == 'compact':
+        index = CompactIndex.from_lines(corpus(occurrences))
+    else:
+        index = index_lines(corpus(occurrences))
+    mem_final = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print('Initial RAM usage: {:14,}'.format(mem_init))
+    print('  Final RAM usage: {:14,}'.format(mem_final))
+    print('   Bytes per item: {:14.1f}'.format(
+        (mem_final - mem_init) * 1024 / occurrences))
+    return index
+
+
+if __name__ == '__main__':
+    if len(sys.argv) not in (2, 3) or sys.argv[1] not in ('list', 'compact'):
+        print(__doc__.strip().splitlines()[2])
+        sys.exit(1)
+    main(sys.argv[1], int(sys.argv[2]) if len(sys.argv) == 3
+         else NUM_OCCURRENCES)
@@ -0,0 +1,63 @@
+"""
+Word index build time: ``setdefault``, ``defaultdict``, bytes ``mmap`` and
+parallel shards
+
+Usage: python word_index_perftest.py <text-file> [max-workers]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import word_index  # noqa: E402
+from word_index import WORD_RE  # noqa: E402
+
+
+def index_setdefault(path):
+    index = {}
+    with open(path, encoding='utf-8') as fp:
+        for line_no, line in enumerate(fp, 1):
+            for match in WORD_RE.finditer(line):
+                location = (line_no, match.start() + 1)
+                index.setdefault(match.group(), []).append(location)
+    return index
+
+
+def timed(func, *args):
+    t0 = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - t0, result
+
+
+def main(path, max_workers):
+    size_mb = os.path.getsize(path) / 2**20
+    print('{:>16} | {:>8} | {:>8} | {:>7}'.format(
+        'version', 'seconds', 'MB/s', 'speedup'))
+    base, expected = timed(index_setdefault, path)
+    print('{:>16} | {:8.3f} | {:8.2f} | {:7.2f}'.format(
+        'setdefault', base, size_mb / base, 1))
+    elapsed, index = timed(word_index.build_index, path)
+    assert index == expected
+    print('{:>16} | {:8.3f} | {:8.2f} | {:7.2f}'.format(
+        'defaultdict', elapsed, size_mb / elapsed, base / elapsed))
+    elapsed, index = timed(word_index.build_index_mmap, path)
+    assert index == expected
+    print('{:>16} | {:8.3f} | {:8.2f} | {:7.2f}'.format(
+        'bytes mmap', elapsed, size_mb / elapsed, base / elapsed))
+    workers = 1
+    while workers <= max_workers:
+        elapsed, index = timed(word_index.build_index_parallel, path, workers)
+        assert index == expected
+        print('{:>16} | {:8.3f} | {:8.2f} | {:7.2f}'.format(
+            'parallel x%d' % workers, elapsed, size_mb / elapsed,
+            base / elapsed))
+        workers *= 2
+
+
+if __name__ == '__main__':
+    if len(sys.argv) not in (2, 3):
+        print(__doc__.strip().splitlines()[-1])
+    else:
+        main(sys.argv[1], int(sys.argv[2]) if len(sys.argv) == 3
+             else os.cpu_count() or 1)
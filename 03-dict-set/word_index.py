@@ -0,0 +1,302 @@
+"""
+Word index (concordance) shared by the ``3x_regex_y_update_diccionario.py``
+examples, with a multiprocess mode for large files.
+
+The index maps every word to the list of its ``(line_no, column_no)``
+locations, both starting at 1::
+
+    >>> import io
+    >>> text = 'a b\\nb c\\n\\nc a b\\n'
+    >>> index = index_lines(io.StringIO(text))
+    >>> sorted(index.items())  # doctest: +NORMALIZE_WHITESPACE
+    [('a', [(1, 1), (4, 3)]), ('b', [(1, 3), (2, 1), (4, 5)]),
+     ('c', [(2, 3), (4, 1)])]
+
+The parallel mode splits the file in byte ranges that end on a line
+boundary, indexes each shard in a worker process and merges the partial
+indexes shifting the line numbers of each shard::
+
+    >>> import os, tempfile
+    >>> fd, path = tempfile.mkstemp()
+    >>> with os.fdopen(fd, 'w', encoding='utf-8') as fp:
+    ...     _ = fp.write(text * 50)
+    >>> shards = shard_ranges(path, 4)
+    >>> len(shards), shards[0][0], shards[-1][1] == os.path.getsize(path)
+    (4, 0, True)
+    >>> parallel = build_index_parallel(path, workers=4)
+    >>> parallel == build_index(path)
+    True
+    >>> parallel['c'][-1]
+    (200, 1)
+    >>> os.remove(path)
+
+``CompactIndex`` keeps the same information in one ``array('I')`` per word,
+interleaving line and column, which takes about 8 bytes per occurrence
+instead of a tuple and its ints::
+
+    >>> compact = CompactIndex.from_lines(io.StringIO(text))
+    >>> compact['b']
+    [(1, 3), (2, 1), (4, 5)]
+    >>> list(compact['c']), len(compact['c'])
+    ([(2, 3), (4, 1)], 2)
+    >>> compact['b'][-1], compact == index
+    ((4, 5), True)
+    >>> report(compact)
+    a [(1, 1), (4, 3)]
+    b [(1, 3), (2, 1), (4, 5)]
+    c [(2, 3), (4, 1)]
+
+``index_bytes`` and ``build_index_mmap`` tokenize the raw UTF-8 bytes (of an
+``mmap`` of the file) instead of decoded lines. Only the tokens with
+non-ASCII bytes and the distinct words are decoded; columns still count
+characters, so the index is the same as the ``str`` one::
+
+    >>> octets = 'Voß: café—latte\\ncafé ①2\\n'.encode('utf-8')
+    >>> dict(index_bytes(octets)) == dict(index_lines(
+    ...     io.StringIO(octets.decode('utf-8'))))
+    True
+    >>> sorted(index_bytes(octets).items())  # doctest: +NORMALIZE_WHITESPACE
+    [('Voß', [(1, 1)]), ('café', [(1, 6), (2, 1)]), ('latte', [(1, 11)]),
+     ('①2', [(2, 6)])]
+
+The only difference is that a lone ``\\r`` does not start a new line::
+
+    >>> dict(index_bytes(b'a\\rb'))
+    {'a': [(1, 1)], 'b': [(1, 3)]}
+
+"""
+
+import collections
+import collections.abc
+import mmap
+import os
+import re
+from array import array
+from concurrent import futures
+from io import TextIOWrapper, BytesIO
+
+WORD_RE = re.compile(r'\w+')
+# ASCII word chars or whole UTF-8 multibyte chars, which are checked later
+# against WORD_RE once decoded; the newline is a token to count lines
+BYTES_TOKEN_RE = re.compile(rb'(?:[0-9A-Za-z_]|[\xc2-\xf4][\x80-\xbf]+)+|\n')
+
+
+def index_lines(lines, index=None, first_line=1):
+    """Add the words of ``lines`` to ``index`` (a ``defaultdict(list)``)"""
+    if index is None:
+        index = collections.defaultdict(list)
+    for line_no, line in enumerate(lines, first_line):
+        for match in WORD_RE.finditer(line):
+            index[match.group()].append((line_no, match.start() + 1))
+    return index
+
+
+def build_index(path):
+    """Single process version, same as ``33_regex_y_update_diccionario.py``"""
+    with open(path, encoding='utf-8') as fp:
+        return index_lines(fp)
+
+
+def index_bytes(buffer):
+    """Index UTF-8 encoded ``buffer`` (``bytes``, ``mmap``...) without
+    decoding it line by line"""
+    index = {}
+    split_cache = {}
+    line_no = 1
+    line_start = extra = 0
+    for match in BYTES_TOKEN_RE.finditer(buffer):
+        token = match.group()
+        if token == b'\n':
+            line_no += 1
+            line_start = match.end()
+            extra = 0
+            continue
+        # extra: bytes de más de los caracteres no ASCII ya vistos en la línea
+        column_no = match.start() - line_start - extra + 1
+        if token.isascii():
+            locations = index.get(token)
+            if locations is None:
+                locations = index[token] = []
+            locations.append((line_no, column_no))
+            continue
+        parts = split_cache.get(token)
+        if parts is None:
+            text = token.decode('utf-8')
+            words = [(m.start(), m.group().encode('utf-8'))
+                     for m in WORD_RE.finditer(text)]
+            parts = split_cache[token] = (len(token) - len(text), words)
+        for offset, word in parts[1]:
+            index.setdefault(word, []).append((line_no, column_no + offset))
+        extra += parts[0]
+    # solo decodificamos cada palabra distinta una vez
+    return collections.defaultdict(
+        list, ((word.decode('utf-8'), locations)
+               for word, locations in index.items()))
+
+
+def build_index_mmap(path):
+    """Same result as ``build_index``, scanning an ``mmap`` of ``path``"""
+    with open(path, 'rb') as fp:
+        if os.fstat(fp.fileno()).st_size == 0:
+            return collections.defaultdict(list)
+        with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            return index_bytes(buffer)
+
+
+def shard_ranges(path, shards):
+    """Split ``path`` in up to ``shards`` ``(start, end)`` byte ranges.
+
+    Every range but the last ends right after a ``b'\\n'``, so no line is
+    split between two shards.
+    """
+    size = os.path.getsize(path)
+    step = max(size // max(shards, 1), 1)
+    ranges = []
+    start = 0
+    with open(path, 'rb') as fp:
+        while start < size:
+            fp.seek(min(start + step, size) - 1)
+            # avanzamos hasta el final de la línea en curso
+            fp.readline()
+            end = min(fp.tell(), size)
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def index_shard(path, start, end):
+    """Index one byte range; returns ``(line_count, index)``.
+
+    The line numbers of the partial index are local to the shard.
+    """
+    with open(path, 'rb') as fp:
+        fp.seek(start)
+        chunk = fp.read(end - start)
+    # TextIOWrapper parte las líneas igual que open() en modo texto
+    lines = TextIOWrapper(BytesIO(chunk), encoding='utf-8')
+    index = collections.defaultdict(list)
+    line_count = 0
+    for line_count, line in enumerate(lines, 1):
+        for match in WORD_RE.finditer(line):
+            index[match.group()].append((line_count, match.start() + 1))
+    return line_count, dict(index)
+
+
+def merge_shards(partials):
+    """Merge ``(line_count, index)`` pairs, in file order, into one index"""
+    index = collections.defaultdict(list)
+    offset = 0
+    for line_count, partial in partials:
+        for word, locations in partial.items():
+            if offset:
+                locations = [(line_no + offset, column_no)
+                             for line_no, column_no in locations]
+            index[word].extend(locations)
+        offset += line_count
+    return index
+
+
+def build_index_parallel(path, workers=None):
+    """Index ``path`` with ``workers`` processes (default: one per core)"""
+    workers = workers or os.cpu_count() or 1
+    ranges = shard_ranges(path, workers)
+    if len(ranges) <= 1:
+        return build_index(path)
+    starts, ends = zip(*ranges)
+    with futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        # map devuelve los resultados en el orden de los shards
+        partials = executor.map(index_shard, [path] * len(ranges),
+                                starts, ends)
+        return merge_shards(partials)
+
+
+class Postings(collections.abc.Sequence):
+    """Read only view of the ``(line_no, column_no)`` pairs of one word"""
+
+    __slots__ = ('_buf',)
+
+    def __init__(self, buf):
+        self._buf = buf
+
+    def __len__(self):
+        return len(self._buf) // 2
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return list(self)[position]
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError('postings index out of range')
+        # cada posición ocupa dos elementos: línea y columna
+        return self._buf[position * 2], self._buf[position * 2 + 1]
+
+    def __iter__(self):
+        # zip sobre el mismo iterador empareja línea y columna
+        it = iter(self._buf)
+        return zip(it, it)
+
+    def __eq__(self, other):
+        if isinstance(other, Postings):
+            return self._buf == other._buf
+        return list(self) == other
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+class CompactIndex(collections.abc.Mapping):
+    """Word index storing the locations of each word in an ``array('I')``"""
+
+    typecode = 'I'
+
+    def __init__(self):
+        self._data = {}
+
+    @classmethod
+    def from_lines(cls, lines, first_line=1):
+        index = cls()
+        index.index_lines(lines, first_line)
+        return index
+
+    @classmethod
+    def from_path(cls, path):
+        with open(path, encoding='utf-8') as fp:
+            return cls.from_lines(fp)
+
+    def index_lines(self, lines, first_line=1):
+        data = self._data
+        typecode = self.typecode
+        for line_no, line in enumerate(lines, first_line):
+            for match in WORD_RE.finditer(line):
+                word = match.group()
+                buf = data.get(word)
+                if buf is None:
+                    buf = data[word] = array(typecode)
+                buf.append(line_no)
+                buf.append(match.start() + 1)
+
+    def add(self, word, line_no, column_no):
+        buf = self._data.get(word)
+        if buf is None:
+            buf = self._data[word] = array(self.typecode)
+        buf.append(line_no)
+        buf.append(column_no)
+
+    def __getitem__(self, word):
+        return Postings(self._data[word])
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, word):
+        return word in self._data
+
+
+def report(index):
+    """Print the index sorted as in the ``3x`` scripts"""
+    for word in sorted(index, key=str.upper):
+        print(word, index[word])
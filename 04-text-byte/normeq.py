@@ -27,13 +27,126 @@ Using Normal Form C with case folding:
     >>> fold_equal('A', 'a')
     True
 
+The normalized forms are ``nfc_key`` and ``fold_key``:
+
+    >>> fold_key(s3), fold_key(s2) == fold_key(s1)
+    ('strasse', True)
+
+To dedupe or join many strings, ``NormalizedDict`` and ``NormalizedSet``
+keep each entry under its key, so a lookup normalizes only the probe:
+
+    >>> names = NormalizedSet(['Straße', 'café', 'STRASSE', s2, 'Zoë'])
+    >>> len(names), list(names)
+    (3, ['Straße', 'café', 'Zoë'])
+    >>> 'ZOË' in names, 'Zoe' in names
+    (True, False)
+    >>> prices = NormalizedDict({'Café': 2.5})
+    >>> prices[s2], prices.get('CAFÉ'), 'cafe' in prices
+    (2.5, 2.5, False)
+    >>> prices['CAFÉ'] = 3
+    >>> prices
+    NormalizedDict({'café': 3})
+    >>> exact = NormalizedDict(key=nfc_key)
+    >>> exact[s2] = 1
+    >>> s1 in exact, 'CAFÉ' in exact
+    (True, False)
+
+``cached_key`` keeps the last ``KEY_CACHE_SIZE`` results of a key function.
+Normalizing a short string costs less than the cache lookup, so it is only
+worth it for long strings that repeat a lot:
+
+    >>> cached = NormalizedSet(['Straße', 'STRASSE'], key=cached_key(fold_key))
+    >>> len(cached), cached.key.cache_info().misses
+    (1, 2)
+
 """
 
+from collections import UserDict
+from collections.abc import MutableSet
+from functools import lru_cache
 from unicodedata import normalize
 
+KEY_CACHE_SIZE = 2 ** 16
+
+
 def nfc_equal(str1, str2):
     return normalize('NFC', str1) == normalize('NFC', str2)
 
 def fold_equal(str1, str2):
     return (normalize('NFC', str1).casefold() ==
             normalize('NFC', str2).casefold())
+
+
+def nfc_key(text):
+    return normalize('NFC', text)
+
+
+def fold_key(text):
+    return normalize('NFC', text).casefold()
+
+
+def cached_key(key, maxsize=KEY_CACHE_SIZE):
+    """``key`` with an LRU cache of its last ``maxsize`` results"""
+    return lru_cache(maxsize=maxsize)(key)
+
+
+class NormalizedDict(UserDict):
+    """Dict whose keys are stored as ``key(k)``: ``fold_key`` by default"""
+
+    def __init__(self, data=(), key=fold_key, **kwargs):
+        self.key = key
+        super().__init__(data, **kwargs)
+
+    def __getitem__(self, key):
+        return self.data[self.key(key)]
+
+    def __setitem__(self, key, value):
+        self.data[self.key(key)] = value
+
+    def __delitem__(self, key):
+        del self.data[self.key(key)]
+
+    def __contains__(self, key):
+        return self.key(key) in self.data
+
+    # UserDict.get miraría 'key in self' y luego self[key]: dos claves
+    def get(self, key, default=None):
+        return self.data.get(self.key(key), default)
+
+    def __repr__(self):
+        return '{}({!r})'.format(type(self).__name__, self.data)
+
+
+class NormalizedSet(MutableSet):
+    """Set of strings where ``key`` equal strings count once
+
+    It keeps the first string added for each key; iterating gives those.
+    """
+
+    def __init__(self, items=(), key=fold_key):
+        self.key = key
+        self._items = {}
+        self.update(items)
+
+    def update(self, items):
+        key, setdefault = self.key, self._items.setdefault
+        for item in items:
+            setdefault(key(item), item)
+
+    def add(self, item):
+        self._items.setdefault(self.key(item), item)
+
+    def discard(self, item):
+        self._items.pop(self.key(item), None)
+
+    def __contains__(self, item):
+        return self.key(item) in self._items
+
+    def __iter__(self):
+        return iter(self._items.values())
+
+    def __len__(self):
+        return len(self._items)
+
+    def __repr__(self):
+        return '{}({!r})'.format(type(self).__name__, list(self))
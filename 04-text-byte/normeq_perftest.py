@@ -0,0 +1,80 @@
+import random
+import sys
+import time
+from unicodedata import normalize
+
+from normeq import NormalizedSet, cached_key, fold_equal, fold_key
+
+NUM_NAMES = 10**6
+NUM_DISTINCT = 50_000
+NUM_PAIRWISE = 5_000
+
+SYLLABLES = 'ma ri jo sé an dré zoë fa bi ßa lu çe ño ka te ré mü ol'.split()
+
+
+def variants(name, rnd):
+    """The same name written in another way: case, NFD, ss for ß"""
+    choice = rnd.randrange(4)
+    if choice == 0:
+        return name.upper()
+    if choice == 1:
+        return normalize('NFD', name)
+    if choice == 2:
+        return name.replace('ß', 'ss').title()
+    return name
+
+
+def make_names(size, distinct, rnd):
+    bases = {''.join(rnd.choices(SYLLABLES, k=rnd.randint(2, 4))).title()
+             for _ in range(distinct)}
+    bases = sorted(bases)
+    return [variants(rnd.choice(bases), rnd) for _ in range(size)]
+
+
+def pairwise(names):
+    # sin índice: cada nombre se compara con todos los ya vistos
+    unique = []
+    for name in names:
+        if not any(fold_equal(name, seen) for seen in unique):
+            unique.append(name)
+    return unique
+
+
+def uncached(names):
+    unique = {}
+    for name in names:
+        unique.setdefault(normalize('NFC', name).casefold(), name)
+    return list(unique.values())
+
+
+def timed(label, names, function):
+    t0 = time.perf_counter()
+    unique = function(names)
+    seconds = time.perf_counter() - t0
+    print('{:>23} | {:9,} | {:8,} | {:8.3f} | {:11,.0f}'.format(
+        label, len(names), len(unique), seconds, len(names) / seconds))
+    return unique
+
+
+def main(size):
+    rnd = random.Random(size)
+    names = make_names(size, NUM_DISTINCT, rnd)
+    print('{:>23} | {:>9} | {:>8} | {:>8} | {:>11}'.format(
+        'method', 'names', 'unique', 'seconds', 'names/s'))
+    # la comparación de todos con todos solo con unos pocos nombres
+    few = names[:NUM_PAIRWISE]
+    expected = timed('pairwise fold_equal', few, pairwise)
+    assert list(NormalizedSet(few)) == expected
+    expected = timed('dict, no cache', names, uncached)
+    unique = timed('NormalizedSet', names, lambda names: list(
+        NormalizedSet(names)))
+    assert unique == expected
+    key = cached_key(fold_key)
+    unique = timed('NormalizedSet, cached', names, lambda names: list(
+        NormalizedSet(names, key=key)))
+    assert unique == expected
+    print('fold_key cache:', key.cache_info())
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else NUM_NAMES)
@@ -0,0 +1,165 @@
+"""
+Numbers written in any script, found with precomputed tables.
+
+``numerics_demo.py`` shows that ``\\d``, ``isdigit``, ``isnumeric`` and
+``unicodedata.numeric`` don't agree. Here ``NUMERIC`` maps every character
+with a numeric value to it, computed once at import; ``tokens`` finds the
+numbers with a regular expression built from that table and converts them
+without calling ``unicodedata``:
+
+    >>> text = 'Mix 1½ cups, ३२ eggs, ⑦ spoons, Ⅻ pies, 2.5 kg and 1⁄4 lb'
+    >>> [value for _, value in tokens(text)]
+    [1.5, 32, 7, 12, 2.5, 0.25]
+
+A run of decimal digits (of any script) is one number, optionally followed
+by a ``.`` and more digits, by a fraction slash (``⁄``) and a denominator,
+or by a vulgar fraction. Any other numeric character (``½``, ``²``, ``⑦``,
+``Ⅻ``, ``万``) is a number by itself:
+
+    >>> values('x² ½ 万 ፲፪ ٣٫١٤ 1.2.3')
+    [2, 0.5, 10000, 10, 2, 3, 14, 1.2, 3]
+
+Each numeric character alone gives one number, its ``unicodedata.numeric``
+value:
+
+    >>> import sys, unicodedata
+    >>> chars = [chr(code) for code in range(sys.maxunicode + 1)
+    ...          if unicodedata.numeric(chr(code), None) is not None]
+    >>> len(chars) == len(NUMERIC)
+    True
+    >>> all(values(char) == [unicodedata.numeric(char)] for char in chars)
+    True
+
+``bytes`` are read as UTF-8; pure ASCII ones are searched without decoding.
+``iter_tokens`` reads a stream of ``str`` or ``bytes`` chunks, and a number
+cut between two chunks stays in one piece:
+
+    >>> values(b'12 apples'), values('٣ apples'.encode('utf-8'))
+    ([12], [3])
+    >>> [value for _, value in iter_tokens([b'total 1', b'2.', '5 lb'])]
+    [12.5]
+"""
+
+import codecs
+import math
+import re
+import sys
+import unicodedata
+from collections import namedtuple
+
+Token = namedtuple('Token', 'text value')
+
+
+def _numeric_table():
+    # isnumeric() es cierto justo para los caracteres con valor numérico
+    table = {}
+    for char in map(chr, range(sys.maxunicode + 1)):
+        if char.isnumeric():
+            value = unicodedata.numeric(char)
+            table[char] = int(value) if value.is_integer() else value
+    return table
+
+
+def _ranges(codes):
+    ranges = []
+    for code in sorted(codes):
+        if ranges and ranges[-1][1] == code - 1:
+            ranges[-1][1] = code
+        else:
+            ranges.append([code, code])
+    return ''.join(re.escape(chr(first)) if first == last else
+                   '{}-{}'.format(re.escape(chr(first)), re.escape(chr(last)))
+                   for first, last in ranges)
+
+
+def _char_class(chars):
+    """Regex matching one of ``chars``, joining consecutive code points"""
+    bmp = [ord(char) for char in chars if char <= '\uffff']
+    astral = [ord(char) for char in chars if char > '\uffff']
+    # re solo convierte en tabla de bits las clases del plano básico; con
+    # caracteres de otros planos compara rango a rango, así que van aparte
+    # y solo se prueban con un carácter de fuera del plano básico
+    pattern = '[{}]'.format(_ranges(bmp))
+    if astral:
+        pattern = '(?:{}|(?=[\U00010000-\U0010ffff])[{}])'.format(
+            pattern, _ranges(astral))
+    return pattern
+
+
+NUMERIC = _numeric_table()
+FRACTIONS = ''.join(char for char, value in NUMERIC.items() if 0 < value < 1)
+OTHERS = ''.join(char for char in NUMERIC if not char.isdecimal())
+
+# \d en un patrón str son los dígitos decimales de cualquier escritura. La
+# primera comprobación descarta deprisa el resto de caracteres ASCII
+NUMBER_RE = re.compile(
+    r'(?=[0-9\x80-\U0010ffff])(?:(\d+)(?:\.(\d+)|⁄(\d+)|({}))?|({}))'.format(
+        _char_class(FRACTIONS), _char_class(OTHERS)))
+ASCII_NUMBER_RE = re.compile(rb'([0-9]+)(?:\.([0-9]+))?')
+
+
+def _value(match):
+    # lastindex es el último grupo que ha participado: dice qué forma tiene
+    group = match.lastindex
+    if group == 1:
+        # int y float entienden dígitos de cualquier escritura
+        return int(match[1])
+    if group == 5:
+        return NUMERIC[match[5]]
+    if group == 2:
+        return float(match[1] + '.' + match[2])
+    number = int(match[1])
+    if group == 3:
+        denominator = int(match[3])
+        return number / denominator if denominator else math.nan
+    return number + NUMERIC[match[4]]
+
+
+def _ascii_value(match):
+    digits, decimals = match.groups()
+    if decimals is not None:
+        return float(match.group())
+    return int(digits)
+
+
+def _matches(text):
+    """``(match, convert)`` for ``text``, str or bytes"""
+    if isinstance(text, (bytes, bytearray)):
+        if text.isascii():
+            return ASCII_NUMBER_RE.finditer(text), _ascii_value
+        text = text.decode('utf-8')
+    return NUMBER_RE.finditer(text), _value
+
+
+def tokens(text):
+    """``Token(text, value)`` for each number in ``text``"""
+    matches, convert = _matches(text)
+    for match in matches:
+        found = match.group()
+        if not isinstance(found, str):
+            found = found.decode('ascii')
+        yield Token(found, convert(match))
+
+
+def values(text):
+    """The values of the numbers in ``text``"""
+    matches, convert = _matches(text)
+    return list(map(convert, matches))
+
+
+def iter_tokens(chunks):
+    """Tokens of a stream of ``str`` or UTF-8 ``bytes`` chunks"""
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    rest = ''
+    for chunk in chunks:
+        if not isinstance(chunk, str):
+            chunk = decoder.decode(chunk)
+        text = rest + chunk
+        rest = ''
+        for match in NUMBER_RE.finditer(text):
+            # un número al final puede seguir en el trozo siguiente
+            if match.end() >= len(text) - 1:
+                rest = text[match.start():]
+                break
+            yield Token(match.group(), _value(match))
+    yield from tokens(rest + decoder.decode(b'', final=True))
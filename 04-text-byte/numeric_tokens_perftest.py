@@ -0,0 +1,103 @@
+import random
+import sys
+import time
+import unicodedata
+
+from numeric_tokens import iter_tokens, values
+
+NUM_LINES = 200_000
+
+ASCII_WORDS = 'cups eggs kg lb total price de la y'.split()
+CORPORA = {
+    'ascii': (ASCII_WORDS, ['12', '3', '2.5', '1999', '0.75']),
+    'unicode': (ASCII_WORDS + 'и 和 الف'.split(),
+                ['12', '2.5', '1½', '३२', '٣', '⑦', 'Ⅻ', '²', '万', '1⁄4']),
+}
+
+
+def catalog(words, numbers, size, rnd):
+    return [' '.join(rnd.choice(words) if rnd.random() < 0.7
+                     else rnd.choice(numbers)
+                     for _ in range(rnd.randint(4, 12)))
+            for _ in range(size)]
+
+
+def naive_values(text):
+    """The same numbers, asking unicodedata for each character"""
+    found = []
+    i, size = 0, len(text)
+    while i < size:
+        char = text[i]
+        if unicodedata.decimal(char, None) is not None:
+            number = 0
+            while i < size and unicodedata.decimal(text[i], None) is not None:
+                number = number * 10 + unicodedata.decimal(text[i])
+                i += 1
+            following = text[i:i + 1]
+            nxt = text[i + 1:i + 2]
+            if following == '.' and nxt and unicodedata.decimal(nxt, None) \
+                    is not None:
+                start = i + 1
+                i += 1
+                while i < size and unicodedata.decimal(text[i], None) \
+                        is not None:
+                    i += 1
+                digits = ''.join(str(unicodedata.decimal(c))
+                                 for c in text[start:i])
+                found.append(float('{}.{}'.format(number, digits)))
+            elif following == '⁄' and nxt and unicodedata.decimal(
+                    nxt, None) is not None:
+                denominator = 0
+                i += 1
+                while i < size and unicodedata.decimal(text[i], None) \
+                        is not None:
+                    denominator = denominator * 10 + unicodedata.decimal(
+                        text[i])
+                    i += 1
+                found.append(number / denominator)
+            elif following and 0 < unicodedata.numeric(following, 0) < 1:
+                found.append(number + unicodedata.numeric(following))
+                i += 1
+            else:
+                found.append(number)
+        else:
+            value = unicodedata.numeric(char, None)
+            if value is not None:
+                found.append(value)
+            i += 1
+    return found
+
+
+def timed(label, megabytes, function):
+    t0 = time.perf_counter()
+    result = function()
+    seconds = time.perf_counter() - t0
+    print('{:>30} | {:8.1f} | {:8.1f}'.format(label, megabytes,
+                                               megabytes / seconds))
+    return result
+
+
+def main(size):
+    rnd = random.Random(size)
+    print('{:>30} | {:>8} | {:>8}'.format('input', 'MB', 'MB/s'))
+    for kind, (words, numbers) in CORPORA.items():
+        lines = catalog(words, numbers, size, rnd)
+        text = '\n'.join(lines)
+        octets = text.encode('utf-8')
+        megabytes = len(octets) / 2**20
+        expected = timed('{} naive unicodedata'.format(kind), megabytes,
+                         lambda: naive_values(text))
+        result = timed('{} values(str)'.format(kind), megabytes,
+                       lambda: values(text))
+        assert result == expected
+        result = timed('{} values(bytes)'.format(kind), megabytes,
+                       lambda: values(octets))
+        assert result == expected
+        chunks = [octets[i:i + 65536] for i in range(0, len(octets), 65536)]
+        result = timed('{} iter_tokens(64k bytes)'.format(kind), megabytes,
+                       lambda: [value for _, value in iter_tokens(chunks)])
+        assert result == expected
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else NUM_LINES)
@@ -0,0 +1,116 @@
+"""
+Radical folding and text sanitizing with ``str.translate`` tables.
+
+Same results as ``sanitize.py``, but each code point is normalized and
+checked with ``unicodedata`` only the first time it is seen: the result is
+kept in a table that ``str.translate`` reads in C. Pure ASCII text is
+returned as is.
+
+Handling a string with `cp1252` symbols:
+
+    >>> order = '“Herr Voß: • ½ cup of Œtker™ caffè latte • bowl of açaí.”'
+    >>> shave_marks(order)
+    '“Herr Voß: • ½ cup of Œtker™ caffe latte • bowl of acai.”'
+    >>> shave_marks_latin(order)
+    '“Herr Voß: • ½ cup of Œtker™ caffe latte • bowl of acai.”'
+    >>> dewinize(order)
+    '"Herr Voß: - ½ cup of OEtker(TM) caffè latte - bowl of açaí."'
+    >>> asciize(order)
+    '"Herr Voss: - 1⁄2 cup of OEtker(TM) caffe latte - bowl of acai."'
+
+Handling a string with Greek and Latin accented characters:
+
+    >>> greek = 'Ζέφυρος, Zéfiro'
+    >>> shave_marks(greek)
+    'Ζεφυρος, Zefiro'
+    >>> shave_marks_latin(greek)
+    'Ζέφυρος, Zefiro'
+    >>> dewinize(greek)
+    'Ζέφυρος, Zéfiro'
+    >>> asciize(greek)
+    'Ζέφυρος, Zefiro'
+
+Whether ``shave_marks_latin`` keeps a loose combining mark depends on the
+base character before it, so a table cannot decide it; text with those
+marks goes through ``sanitize.shave_marks_latin``:
+
+    >>> shave_marks_latin('Zéfiro, έ'), asciize('xཱི')
+    ('Zefiro, έ', 'x')
+
+"""
+
+import re
+import unicodedata
+
+import sanitize
+from sanitize import dewinize
+
+
+def _leads_with_mark(char):
+    """True if the NFD of ``char`` starts with a combining mark"""
+    return bool(unicodedata.combining(unicodedata.normalize('NFD', char)[0]))
+
+
+class TranslationTable(dict):
+    """``str.translate`` table filled on demand with ``convert(char)``
+
+    With ``contextual=True`` it also remembers the characters that begin
+    with a combining mark, for ``has_contextual``.
+    """
+
+    def __init__(self, convert, contextual=False):
+        super().__init__()
+        self.convert = convert
+        self.contextual = set() if contextual else None
+        self._pattern = None
+
+    def __missing__(self, code):
+        char = chr(code)
+        if self.contextual is not None and _leads_with_mark(char):
+            self.contextual.add(char)
+            self._pattern = None
+        result = self[code] = self.convert(char)
+        return result
+
+    def has_contextual(self, txt):
+        """True if ``txt`` has a character that begins with a combining mark;
+        only valid after translating ``txt`` with this table"""
+        if not self.contextual:
+            return False
+        if self._pattern is None:
+            chars = ''.join(map(re.escape, sorted(self.contextual)))
+            self._pattern = re.compile('[{}]'.format(chars))
+        return self._pattern.search(txt) is not None
+
+
+_shave_table = TranslationTable(sanitize.shave_marks)
+_latin_table = TranslationTable(sanitize.shave_marks_latin, contextual=True)
+_ascii_table = TranslationTable(sanitize.asciize, contextual=True)
+
+
+def shave_marks(txt):
+    """Remove all diacritic marks"""
+    if txt.isascii():
+        return txt
+    # NFC del texto entero: hay caracteres (jamo de Hangul) que se componen
+    # con el siguiente
+    return unicodedata.normalize('NFC', txt.translate(_shave_table))
+
+
+def shave_marks_latin(txt):
+    """Remove all diacritic marks from Latin base characters"""
+    if txt.isascii():
+        return txt
+    shaved = txt.translate(_latin_table)
+    if _latin_table.has_contextual(txt):
+        return sanitize.shave_marks_latin(txt)
+    return unicodedata.normalize('NFC', shaved)
+
+
+def asciize(txt):
+    if txt.isascii():
+        return txt
+    folded = txt.translate(_ascii_table)
+    if _ascii_table.has_contextual(txt):
+        return sanitize.asciize(txt)
+    return unicodedata.normalize('NFKC', folded)
@@ -0,0 +1,53 @@
+import random
+import sys
+import time
+
+import sanitize
+import sanitize_fast
+
+FUNCTIONS = ['shave_marks', 'shave_marks_latin', 'asciize']
+NUM_LINES = 100_000
+
+WORDS = {
+    'ascii': 'blue steel cable kit pack of 12 red usb charger mini pro'.split(),
+    'latin': 'café açaí crème brûlée jalapeño Voß Œtker™ “bio” naïve'.split() +
+             'piñata résumé Zürich São Paulo € … déjà vu'.split(),
+    'greek': 'Ζέφυρος καφές ελαιόλαδο μέλι Zéfiro Ἀθῆναι'.split(),
+}
+CORPORA = {
+    'ascii': ['ascii'],
+    'latin': ['ascii', 'latin'],
+    'mixed': ['ascii', 'latin', 'greek'],
+}
+
+
+def catalog(kinds, size, rnd):
+    """``size`` product lines with words of ``kinds``"""
+    words = [word for kind in kinds for word in WORDS[kind]]
+    return [' '.join(rnd.choices(words, k=rnd.randint(3, 12)))
+            for _ in range(size)]
+
+
+def timed(function, lines):
+    t0 = time.perf_counter()
+    result = list(map(function, lines))
+    return result, time.perf_counter() - t0
+
+
+def main(size):
+    rnd = random.Random(size)
+    print('{:>6} | {:>18} | {:>10} | {:>10} | {:>7}'.format(
+        'corpus', 'function', 'old MB/s', 'fast MB/s', 'speedup'))
+    for corpus, kinds in CORPORA.items():
+        lines = catalog(kinds, size, rnd)
+        megabytes = sum(len(line.encode('utf-8')) for line in lines) / 2**20
+        for name in FUNCTIONS:
+            expected, old = timed(getattr(sanitize, name), lines)
+            result, fast = timed(getattr(sanitize_fast, name), lines)
+            assert result == expected, name
+            print('{:>6} | {:>18} | {:10.1f} | {:10.1f} | {:7.1f}'.format(
+                corpus, name, megabytes / old, megabytes / fast, old / fast))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else NUM_LINES)
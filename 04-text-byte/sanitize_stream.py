@@ -0,0 +1,139 @@
+"""
+Sanitizing text streams in bounded chunks.
+
+``iter_chunks`` joins pieces of text (lines, or blocks read from a file)
+into chunks of about ``chunk_chars`` characters. A chunk only ends after a
+newline or before an ASCII character: nothing there composes with what
+comes before, so a combining mark never gets split from its base:
+
+    >>> pieces = ['cafe', '\\u0301 naive']
+    >>> print(*map(ascii, iter_chunks(pieces, chunk_chars=4)))
+    'caf' 'e\\u0301 naiv' 'e'
+    >>> ''.join(sanitize_stream(pieces, chunk_chars=4))
+    'cafe naive'
+
+A text with no newline or ASCII character waits for more text, up to
+``MAX_GROWTH`` times ``chunk_chars``; then it is cut before a character
+that doesn't compose with the previous one, so the chunk stays the same
+after NFC normalization:
+
+    >>> from unicodedata import normalize
+    >>> greek = ['ά' * 3 + 'ε\u0301' * 3] * 20
+    >>> chunks = list(iter_chunks(greek, chunk_chars=10))
+    >>> [len(chunk) for chunk in chunks]
+    [79, 81, 20]
+    >>> (''.join(map(partial(normalize, 'NFC'), chunks)) ==
+    ...  normalize('NFC', ''.join(greek)))
+    True
+
+Nor before a character whose NFD starts with combining marks, like the
+Tibetan vowel U+0F73, which ``asciize`` would attach to the previous base:
+
+    >>> tibetan = ['é' * 7 + '\u0f73'] * 12
+    >>> (''.join(sanitize_stream(tibetan, chunk_chars=8)) ==
+    ...  asciize(''.join(tibetan)))
+    True
+
+``sanitize_stream`` applies ``function`` (``sanitize_fast.asciize`` by
+default) to each chunk; with ``workers`` the chunks go to a process pool,
+but the results come out in order and only a few chunks are in flight:
+
+    >>> lines = ['“Herr Voß: • ½ cup of Œtker™ caffè latte”\\n'] * 1000
+    >>> out = list(sanitize_stream(lines, chunk_chars=5000, workers=2))
+    >>> ''.join(out) == asciize(''.join(lines)), len(out)
+    (True, 9)
+
+``sanitize_file`` does the same from one text file to another.
+"""
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from unicodedata import normalize
+
+from sanitize_fast import _leads_with_mark, asciize
+
+CHUNK_CHARS = 2 ** 20
+# sin un punto de corte seguro, un trozo crece hasta este múltiplo
+MAX_GROWTH = 8
+
+
+def _safe_cut(text):
+    """Position where ``text`` can be split, or 0 if there is none"""
+    cut = text.rfind('\n') + 1
+    if cut:
+        return cut
+    # antes de un carácter ASCII: no se compone con el anterior
+    for i in range(len(text) - 1, 0, -1):
+        if text[i] < '\x80':
+            return i
+    return 0
+
+
+def _starter_cut(text):
+    """Position before a character that doesn't compose with the previous
+    one, or 0 if there is none"""
+    for i in range(len(text) - 1, 0, -1):
+        # ni marcas ni caracteres cuya NFD empieza por una (U+0F73): se
+        # pegarían a la base anterior. Los demás solo se componen con el
+        # anterior (jamos hangul, vocales indias...): lo dice NFC del par
+        if not _leads_with_mark(text[i]) and (
+                normalize('NFC', text[i - 1:i + 1]) ==
+                normalize('NFC', text[i - 1]) + normalize('NFC', text[i])):
+            return i
+    return 0
+
+
+def iter_chunks(pieces, chunk_chars=CHUNK_CHARS):
+    """Chunks of ``pieces`` that can be sanitized one by one"""
+    buffer, size, limit = [], 0, chunk_chars
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= limit:
+            text = ''.join(buffer)
+            cut = _safe_cut(text)
+            if not cut and limit >= MAX_GROWTH * chunk_chars:
+                # ya no se espera más: entre dos caracteres que no se
+                # componen o, si solo hay marcas sueltas, donde sea
+                cut = _starter_cut(text) or len(text)
+            if cut:
+                yield text[:cut]
+                limit = chunk_chars
+            else:
+                # sin punto de corte: se espera a tener el doble
+                limit *= 2
+            buffer = [text[cut:]]
+            size = len(buffer[0])
+    text = ''.join(buffer)
+    if text:
+        yield text
+
+
+def sanitize_stream(pieces, function=asciize, chunk_chars=CHUNK_CHARS,
+                    workers=None):
+    """Sanitized chunks of ``pieces``, in order"""
+    chunks = iter_chunks(pieces, chunk_chars)
+    if not workers:
+        yield from map(function, chunks)
+        return
+    with ProcessPoolExecutor(workers) as executor:
+        # como mucho 2 trozos por proceso a la vez: la memoria no crece
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(function, chunk))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def sanitize_file(source, target, function=asciize, encoding='utf-8',
+                  chunk_chars=CHUNK_CHARS, workers=None):
+    """Write to the path ``target`` the sanitized text of ``source``"""
+    # newline='': los finales de línea se copian tal cual
+    with open(source, encoding=encoding, newline='') as src, \
+            open(target, 'w', encoding=encoding, newline='') as dst:
+        blocks = iter(partial(src.read, chunk_chars), '')
+        for text in sanitize_stream(blocks, function, chunk_chars, workers):
+            dst.write(text)
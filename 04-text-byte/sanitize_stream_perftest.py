@@ -0,0 +1,51 @@
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from sanitize_fast_perftest import catalog
+from sanitize_stream import sanitize_file
+
+SIZES = [100_000, 400_000, 1_600_000]
+WORKERS = [None, 2]
+
+
+def write_catalog(path, size):
+    rnd = random.Random(size)
+    with open(path, 'w', encoding='utf-8') as fp:
+        # por tandas, para no tener el catálogo entero en memoria
+        for _ in range(0, size, 10_000):
+            fp.writelines(line + '\n' for line in
+                          catalog(['ascii', 'latin', 'greek'], 10_000, rnd))
+
+
+def main(sizes):
+    directory = tempfile.mkdtemp()
+    source = os.path.join(directory, 'catalog.txt')
+    target = os.path.join(directory, 'catalog_ascii.txt')
+    print('{:>8} | {:>8} | {:>7} | {:>8} | {:>12}'.format(
+        'lines', 'MB', 'workers', 'MB/s', 'peak kB'))
+    for size in sizes:
+        write_catalog(source, size)
+        megabytes = os.path.getsize(source) / 2**20
+        for workers in WORKERS:
+            t0 = time.perf_counter()
+            sanitize_file(source, target, workers=workers)
+            seconds = time.perf_counter() - t0
+            # otra pasada para la memoria: tracemalloc frena cada reserva.
+            # Solo se mide el proceso principal, no los trabajadores
+            tracemalloc.start()
+            sanitize_file(source, target, workers=workers)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print('{:8,} | {:8.1f} | {:>7} | {:8.1f} | {:12,}'.format(
+                size, megabytes, str(workers), megabytes / seconds,
+                peak // 1024))
+    os.remove(source)
+    os.remove(target)
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or SIZES)
@@ -0,0 +1,202 @@
+"""
+Bulk transcoding of text files in mixed encodings.
+
+``detect_encoding`` looks at the first bytes of a file: a BOM, valid UTF-8,
+or else cp1252 (bytes 0x80-0x9F are printable there: € ‘ ’ “ ” …) unless
+it has one of the five bytes that cp1252 leaves undefined, and then
+latin-1::
+
+    >>> detect_encoding('Olá'.encode('utf-8'))
+    'utf-8'
+    >>> detect_encoding('“Olá”'.encode('cp1252'))
+    'cp1252'
+    >>> detect_encoding(b'Ol\\xe1 \\x81'), detect_encoding(b'\\xff\\xfeO\\x00')
+    ('latin-1', 'utf-16')
+
+``transcode_file`` decodes the file in chunks with an incremental decoder,
+optionally passes the text through ``sanitize.dewinize`` and writes it
+in the target encoding. If a later chunk doesn't decode with the guess
+(the sample was all ASCII, say), it starts again with the next candidate:
+utf-8, then cp1252, then latin-1, which decodes anything::
+
+    >>> import os, tempfile
+    >>> source, target = tempfile.mkdtemp(), tempfile.mkdtemp()
+    >>> samples = {'utf8.txt': ('Olá, Mundo', 'utf-8'),
+    ...            'win.txt': ('“Olá”, Mundo… 5€', 'cp1252'),
+    ...            'late.txt': ('Mundo ' * 100 + 'Olá', 'cp1252')}
+    >>> for name, (text, encoding) in samples.items():
+    ...     with open(os.path.join(source, name), 'w',
+    ...               encoding=encoding) as fp:
+    ...         _ = fp.write(text)
+    >>> for report in transcode_dir(source, target, dewinize=True,
+    ...                             sample_size=64):
+    ...     print(report.name, report.encoding, report.restarts)
+    late.txt cp1252 1
+    utf8.txt utf-8 0
+    win.txt cp1252 0
+    >>> with open(os.path.join(target, 'win.txt'), encoding='utf-8') as fp:
+    ...     fp.read()
+    '"Olá", Mundo... 5<euro>'
+
+The target is opened for writing while the source is read, so writing a
+file onto itself is refused:
+
+    >>> transcode_file(os.path.join(source, 'win.txt'),
+    ...                os.path.join(source, '.', 'win.txt'))
+    Traceback (most recent call last):
+      ...
+    ValueError: source and target are the same file
+    >>> next(transcode_dir(source, os.path.join(source, '')))
+    Traceback (most recent call last):
+      ...
+    ValueError: source and target are the same directory
+
+Run as a script to transcode a directory and see the throughput of each
+file::
+
+    $ python3 transcode.py SOURCE_DIR TARGET_DIR --dewinize --workers 4
+"""
+
+import argparse
+import codecs
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import sanitize
+
+SAMPLE_SIZE = 2 ** 16
+CHUNK_SIZE = 2 ** 20
+
+# los de UTF-32 antes: el BOM de UTF-32 LE empieza por el de UTF-16 LE
+BOMS = [
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+# bytes sin carácter en cp1252
+CP1252_UNDEFINED = frozenset(b'\x81\x8d\x8f\x90\x9d')
+# la codificación a probar cuando falla la anterior
+FALLBACKS = {'utf-8': 'cp1252', 'cp1252': 'latin-1'}
+
+Report = namedtuple('Report', 'name encoding restarts size seconds')
+
+
+def detect_encoding(sample):
+    """Encoding of a file that begins with the bytes ``sample``"""
+    for bom, encoding in BOMS:
+        if sample.startswith(bom):
+            return encoding
+    try:
+        # final=False: la muestra puede cortar un carácter por la mitad
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+    except UnicodeDecodeError:
+        pass
+    else:
+        return 'utf-8'
+    if CP1252_UNDEFINED.isdisjoint(sample):
+        return 'cp1252'
+    return 'latin-1'
+
+
+def _same(path1, path2):
+    # samefile también ve los enlaces; el destino puede no existir aún
+    return os.path.exists(path2) and os.path.samefile(path1, path2)
+
+
+def _transcode(source, target, encoding, target_encoding, dewinize,
+               chunk_size):
+    decoder = codecs.getincrementaldecoder(encoding)()
+    encoder = codecs.getincrementalencoder(target_encoding)()
+    with open(source, 'rb') as src, open(target, 'wb') as dst:
+        final = False
+        while not final:
+            chunk = src.read(chunk_size)
+            final = not chunk
+            text = decoder.decode(chunk, final=final)
+            if dewinize:
+                text = sanitize.dewinize(text)
+            dst.write(encoder.encode(text, final=final))
+
+
+def transcode_file(source, target, encoding=None, target_encoding='utf-8',
+                   dewinize=False, sample_size=SAMPLE_SIZE,
+                   chunk_size=CHUNK_SIZE):
+    """Write ``source`` to ``target`` in ``target_encoding``; the encoding
+    of ``source`` is guessed from its first ``sample_size`` bytes unless
+    it is given"""
+    if _same(source, target):
+        # abrir target con 'wb' vaciaría el fichero antes de leerlo
+        raise ValueError('source and target are the same file')
+    t0 = time.perf_counter()
+    if encoding is None:
+        with open(source, 'rb') as fp:
+            encoding = detect_encoding(fp.read(sample_size))
+    restarts = 0
+    while True:
+        try:
+            _transcode(source, target, encoding, target_encoding, dewinize,
+                       chunk_size)
+            break
+        except UnicodeDecodeError:
+            if encoding not in FALLBACKS:
+                raise
+            encoding = FALLBACKS[encoding]
+            restarts += 1
+    return Report(os.path.basename(source), encoding, restarts,
+                  os.path.getsize(source), time.perf_counter() - t0)
+
+
+def transcode_dir(source_dir, target_dir, workers=4, **options):
+    """Transcode every file of ``source_dir`` into ``target_dir`` with a
+    pool of ``workers`` threads; yields a ``Report`` per file, sorted by
+    name. ``options`` go to ``transcode_file``"""
+    if _same(source_dir, target_dir):
+        raise ValueError('source and target are the same directory')
+    os.makedirs(target_dir, exist_ok=True)
+    names = sorted(entry.name for entry in os.scandir(source_dir)
+                   if entry.is_file())
+
+    def transcode(name):
+        return transcode_file(os.path.join(source_dir, name),
+                              os.path.join(target_dir, name), **options)
+
+    with ThreadPoolExecutor(workers) as executor:
+        yield from executor.map(transcode, names)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Transcode the files of a directory')
+    parser.add_argument('source_dir')
+    parser.add_argument('target_dir')
+    parser.add_argument('--to', default='utf-8', dest='target_encoding')
+    parser.add_argument('--dewinize', action='store_true',
+                        help='replace cp1252 symbols with ASCII')
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+    if _same(args.source_dir, args.target_dir):
+        parser.error('target_dir must be another directory')
+    print('{:>30} | {:>9} | {:>10} | {:>8}'.format(
+        'file', 'encoding', 'KB', 'MB/s'))
+    total_size = 0
+    t0 = time.perf_counter()
+    for report in transcode_dir(args.source_dir, args.target_dir,
+                                workers=args.workers,
+                                target_encoding=args.target_encoding,
+                                dewinize=args.dewinize):
+        total_size += report.size
+        encoding = report.encoding + '*' * report.restarts
+        print('{:>30} | {:>9} | {:10,.0f} | {:8.1f}'.format(
+            report.name, encoding, report.size / 1024,
+            report.size / 2**20 / max(report.seconds, 1e-9)))
+    seconds = time.perf_counter() - t0
+    print('{:>30} | {:>9} | {:10,.0f} | {:8.1f}'.format(
+        'total', '', total_size / 1024, total_size / 2**20 / seconds))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,24 +1,191 @@
+import argparse
+import dataclasses
+import gc
 import importlib
-import sys
+import json
 import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import NamedTuple
+
+from vector2d_array import Vector2dArray
 
 NUM_VECTORS = 10**7
+# tracemalloc hace lenta la construcción: medimos bytes/instancia en una muestra
+TRACE_SAMPLE = 10**5
+
+
+class Plain:
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+
+class Slots:
+    __slots__ = ('x', 'y')
+
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+
+class Named(NamedTuple):
+    x: float
+    y: float
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class FrozenData:
+    x: float
+    y: float
+
+
+def build_objects(cls):
+    return lambda n: [cls(float(i), i + 0.5) for i in range(n)]
+
+
+def access_attributes(vectors):
+    total = 0.0
+    for v in vectors:
+        total += v.x + v.y
+    return total
+
 
-if len(sys.argv) == 2:
-    module_name = sys.argv[1].replace('.py', '')
+def access_items(vectors):
+    total = 0.0
+    for v in vectors:
+        total += v[0] + v[1]
+    return total
+
+
+def access_columns(vectors):
+    total = 0.0
+    for x, y in zip(vectors.x, vectors.y):
+        total += x + y
+    return total
+
+
+def vector2d(module_name):
+    return importlib.import_module(module_name).Vector2d
+
+
+# nombre -> (construye n vectores, recorre x e y de todos)
+LAYOUTS = {
+    'plain': (build_objects(Plain), access_attributes),
+    'slots': (build_objects(Slots), access_attributes),
+    'namedtuple': (build_objects(Named), access_attributes),
+    'dataclass': (build_objects(FrozenData), access_attributes),
+    'tuple': (lambda n: [(float(i), i + 0.5) for i in range(n)],
+              access_items),
+    'vector2d_v3': (lambda n: build_objects(vector2d('vector2d_v3'))(n),
+                    access_attributes),
+    'vector2d_v3_slots': (
+        lambda n: build_objects(vector2d('vector2d_v3_slots'))(n),
+        access_attributes),
+    'array': (lambda n: Vector2dArray(map(float, range(n)),
+                                      (i + 0.5 for i in range(n))),
+              access_columns),
+}
+
+
+def rss():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def profile(name, num_vectors):
+    """Measure one layout; meant to run alone in its own process"""
+    build, access = LAYOUTS[name]
+    mem_init = rss()
+    t0 = time.perf_counter()
+    vectors = build(num_vectors)
+    build_time = time.perf_counter() - t0
+    mem_final = rss()
+    t0 = time.perf_counter()
+    access(vectors)
+    access_time = time.perf_counter() - t0
+    # pausa de una colección completa con todos los vectores vivos
+    t0 = time.perf_counter()
+    gc.collect()
+    gc_pause = time.perf_counter() - t0
+    del vectors
+    sample = min(num_vectors, TRACE_SAMPLE)
+    tracemalloc.start()
+    vectors = build(sample)
+    traced = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return {
+        'layout': name,
+        'vectors': num_vectors,
+        'build_s': build_time,
+        'access_ns': access_time / num_vectors * 1e9,
+        'gc_pause_s': gc_pause,
+        'bytes_per_vector': traced / sample,
+        'rss_init_kb': mem_init,
+        'rss_final_kb': mem_final,
+    }
+
+
+def compare(layouts, num_vectors, json_path=None):
+    results = []
+    print('{:>18} | {:>8} | {:>9} | {:>8} | {:>9} | {:>12}'.format(
+        'layout', 'build s', 'access ns', 'gc s', 'bytes/vec', 'peak RSS kB'))
+    for name in layouts:
+        # cada layout en su proceso: el ru_maxrss de uno no tapa al siguiente
+        child = subprocess.run(
+            [sys.executable, __file__, '--layout', name, '--num',
+             str(num_vectors)], capture_output=True, text=True, check=True)
+        result = json.loads(child.stdout)
+        results.append(result)
+        print('{layout:>18} | {build_s:8.2f} | {access_ns:9.1f} | '
+              '{gc_pause_s:8.3f} | {bytes_per_vector:9.1f} | '
+              '{rss_final_kb:12,}'.format(**result))
+    if json_path:
+        with open(json_path, 'w') as fp:
+            json.dump(results, fp, indent=2)
+    return results
+
+
+def mem_test(module_name, num_vectors):
     module = importlib.import_module(module_name)
-else:
-    print('Usage: {} <vector-module-to-test>'.format(sys.argv[0]))
-    sys.exit(1)
+    fmt = 'Selected Vector2d type: {.__name__}.{.__name__}'
+    print(fmt.format(module, module.Vector2d))
+
+    mem_init = rss()
+    print('Creating {:,} Vector2d instances'.format(num_vectors))
+
+    vectors = [module.Vector2d(3.0, 4.0) for i in range(num_vectors)]
+
+    mem_final = rss()
+    print('Initial RAM usage: {:14,}'.format(mem_init))
+    print('  Final RAM usage: {:14,}'.format(mem_final))
 
-fmt = 'Selected Vector2d type: {.__name__}.{.__name__}'
-print(fmt.format(module, module.Vector2d))
 
-mem_init = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
-print('Creating {:,} Vector2d instances'.format(NUM_VECTORS))
+def main(argv):
+    parser = argparse.ArgumentParser(
+        usage='%(prog)s <vector-module-to-test> | --compare [LAYOUT ...]')
+    parser.add_argument('module', nargs='?',
+                        help='module with a Vector2d class, e.g. vector2d_v3')
+    parser.add_argument('--compare', nargs='*', metavar='LAYOUT',
+                        choices=list(LAYOUTS),
+                        help='compare layouts (all when none is given)')
+    parser.add_argument('--layout', choices=list(LAYOUTS),
+                        help=argparse.SUPPRESS)
+    parser.add_argument('--num', type=int, default=NUM_VECTORS)
+    parser.add_argument('--json', help='write the comparison as JSON')
+    args = parser.parse_args(argv)
+    if args.layout:
+        print(json.dumps(profile(args.layout, args.num)))
+    elif args.compare is not None:
+        compare(args.compare or list(LAYOUTS), args.num, args.json)
+    elif args.module:
+        mem_test(args.module.replace('.py', ''), args.num)
+    else:
+        parser.print_usage()
+        return 1
+    return 0
 
-vectors = [module.Vector2d(3.0, 4.0) for i in range(NUM_VECTORS)]
 
-mem_final = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
-print('Initial RAM usage: {:14,}'.format(mem_init))
-print('  Final RAM usage: {:14,}'.format(mem_final))
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,181 @@
+"""
+Vector2dArray: many ``Vector2d`` stored as two ``array('d')`` columns
+
+    >>> vectors = Vector2dArray([3, 0, -1], [4, 2, 0])
+    >>> len(vectors), vectors[0]
+    (3, Vector2d(3.0, 4.0))
+    >>> abs(vectors)
+    array('d', [5.0, 2.0, 1.0])
+    >>> vectors.angle() == array('d', [v.angle() for v in vectors])
+    True
+    >>> vectors + vectors * 2
+    Vector2dArray([9.0, 0.0, -3.0], [12.0, 6.0, 0.0])
+    >>> vectors[1:] == Vector2dArray.fromvectors([Vector2d(0, 2), Vector2d(-1, 0)])
+    True
+    >>> list(vectors.hashes()) == [hash(v) for v in vectors]
+    True
+
+``format`` applies the spec of ``Vector2d.__format__`` to every vector::
+
+    >>> format(vectors, '.3ep')
+    '[<5.000e+00, 9.273e-01>, <2.000e+00, 1.571e+00>, <1.000e+00, 3.142e+00>]'
+    >>> vectors.formatted('.1f')[:2]
+    ['(3.0, 4.0)', '(0.0, 2.0)']
+
+``bytes()`` gives the concatenation of ``bytes(v)`` for each vector, and
+``frombytes`` reads it back::
+
+    >>> octets = bytes(vectors)
+    >>> octets == b''.join(bytes(v) for v in vectors)
+    True
+    >>> Vector2dArray.frombytes(octets) == vectors
+    True
+
+Like ``list`` and ``array``, and unlike NumPy, ``==`` compares the whole
+arrays and gives one ``bool``; compare vector by vector to get one result
+per element::
+
+    >>> other = Vector2dArray([3, 0, 1], [4, 2, 0])
+    >>> other == vectors, [v == w for v, w in zip(other, vectors)]
+    (False, [True, True, False])
+"""
+
+import math
+import operator
+import reprlib
+from array import array
+from itertools import repeat
+
+from vector2d_v3 import Vector2d
+
+
+class Vector2dArray:
+    typecode = 'd'
+    vector_class = Vector2d
+
+    def __init__(self, xs=(), ys=()):
+        self._x = array(self.typecode, xs)
+        self._y = array(self.typecode, ys)
+        if len(self._x) != len(self._y):
+            raise ValueError('xs and ys must have the same length')
+
+    @classmethod
+    def fromvectors(cls, vectors):
+        vectors = list(vectors)
+        return cls(map(operator.attrgetter('x'), vectors),
+                   map(operator.attrgetter('y'), vectors))
+
+    @classmethod
+    def _from_columns(cls, xs, ys):
+        # las columnas ya son arrays: nos ahorramos la copia de __init__
+        vectors = cls.__new__(cls)
+        vectors._x = xs
+        vectors._y = ys
+        return vectors
+
+    @property
+    def x(self):
+        return self._x
+
+    @property
+    def y(self):
+        return self._y
+
+    def __len__(self):
+        return len(self._x)
+
+    #Los Vector2d solo se crean cuando se piden
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self._from_columns(self._x[index], self._y[index])
+        return self.vector_class(self._x[index], self._y[index])
+
+    def __iter__(self):
+        return map(self.vector_class, self._x, self._y)
+
+    def __repr__(self):
+        return '{}({}, {})'.format(type(self).__name__,
+                                   reprlib.repr(self._x.tolist()),
+                                   reprlib.repr(self._y.tolist()))
+
+    #Igualdad de todo el array (un solo bool, como en array), comparando
+    #las columnas en C
+    def __eq__(self, other):
+        if isinstance(other, Vector2dArray):
+            return self._x == other._x and self._y == other._y
+        return NotImplemented
+
+    __hash__ = None  # es mutable, como array
+
+    def __abs__(self):
+        return array(self.typecode, map(math.hypot, self._x, self._y))
+
+    def angle(self):
+        return array(self.typecode, map(math.atan2, self._y, self._x))
+
+    def __add__(self, other):
+        if not isinstance(other, Vector2dArray):
+            return NotImplemented
+        if len(self) != len(other):
+            raise ValueError('arrays must have the same length')
+        return self._from_columns(
+            array(self.typecode, map(operator.add, self._x, other._x)),
+            array(self.typecode, map(operator.add, self._y, other._y)))
+
+    def __mul__(self, scalar):
+        if not isinstance(scalar, (int, float)):
+            return NotImplemented
+        return self._from_columns(
+            array(self.typecode, map(operator.mul, self._x, repeat(scalar))),
+            array(self.typecode, map(operator.mul, self._y, repeat(scalar))))
+
+    __rmul__ = __mul__
+
+    def hashes(self):
+        """``hash(v)`` of every vector, as computed by ``Vector2d``"""
+        return array('q', map(operator.xor, map(hash, self._x),
+                              map(hash, self._y)))
+
+    def formatted(self, fmt_spec=''):
+        """``format(v, fmt_spec)`` of every vector"""
+        if fmt_spec.endswith('p'):
+            fmt_spec = fmt_spec[:-1]
+            coords = (abs(self), self.angle())
+            outer_fmt = '<{}, {}>'
+        else:
+            coords = (self._x, self._y)
+            outer_fmt = '({}, {})'
+        first, second = (map(format, column, repeat(fmt_spec))
+                         for column in coords)
+        return list(map(outer_fmt.format, first, second))
+
+    def __format__(self, fmt_spec=''):
+        return '[{}]'.format(', '.join(self.formatted(fmt_spec)))
+
+    #Cada vector ocupa 17 bytes: typecode + x + y, como Vector2d.__bytes__.
+    #Las columnas se entrelazan con asignaciones por slices, todo en C
+    def __bytes__(self):
+        size = len(self)
+        pairs = array(self.typecode, bytes(16 * size))
+        pairs[0::2] = self._x
+        pairs[1::2] = self._y
+        packed = pairs.tobytes()
+        octets = bytearray(17 * size)
+        octets[0::17] = self.typecode.encode() * size
+        for offset in range(16):
+            octets[offset + 1::17] = packed[offset::16]
+        return bytes(octets)
+
+    @classmethod
+    def frombytes(cls, octets):
+        if len(octets) % 17:
+            raise ValueError('length is not a multiple of 17 bytes')
+        size = len(octets) // 17
+        octets = bytes(octets)
+        if octets[0::17] != cls.typecode.encode() * size:
+            raise ValueError('expected typecode {!r}'.format(cls.typecode))
+        packed = bytearray(16 * size)
+        for offset in range(16):
+            packed[offset::16] = octets[offset + 1::17]
+        pairs = array(cls.typecode, packed)
+        return cls._from_columns(pairs[0::2], pairs[1::2])
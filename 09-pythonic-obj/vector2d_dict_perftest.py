@@ -0,0 +1,43 @@
+import importlib
+import random
+import sys
+import time
+
+MODULES = ['vector2d_v3', 'vector2d_v3_slots', 'vector2d_v3_hashed']
+SIZES = [10**6, 10**7]
+
+
+def timed(function):
+    t0 = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - t0
+
+
+def coordinates(size):
+    # con una rejilla de enteros hash(x) ^ hash(y) de vector2d_v3 colisiona
+    # tanto que la tabla se vuelve cuadrática: usamos floats aleatorios
+    rnd = random.Random(size)
+    return [(rnd.uniform(-180, 180), rnd.uniform(-90, 90))
+            for _ in range(size)]
+
+
+def main(sizes):
+    print('{:>20} | {:>10} | {:>9} | {:>9} | {:>9}'.format(
+        'module', 'keys', 'build s', 'insert s', 'lookup s'))
+    for size in sizes:
+        points = coordinates(size)
+        for name in MODULES:
+            Vector2d = importlib.import_module(name).Vector2d
+            keys, build = timed(lambda: [Vector2d(x, y) for x, y in points])
+            table, insert = timed(lambda: {key: i for i, key in enumerate(keys)})
+            # objetos nuevos: la búsqueda no puede acertar por identidad
+            probes = [Vector2d(x, y) for x, y in points[::10]]
+            found, lookup = timed(lambda: sum(key in table for key in probes))
+            assert found == len(probes)
+            print('{:>20} | {:10,} | {:9.3f} | {:9.3f} | {:9.3f}'.format(
+                name, size, build, insert, lookup * 10))
+            del keys, table, probes
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or SIZES)
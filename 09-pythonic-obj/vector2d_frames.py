@@ -0,0 +1,143 @@
+"""
+Framed binary format for many ``Vector2d``
+
+``bytes(v)`` spends a typecode byte and a Python call per vector. A frame
+has a 16 byte header followed by the packed coordinates::
+
+    header   magic b'V2D\\0', typecode, byte order, 2 pad bytes, count (Q)
+    payload  x0 y0 x1 y1 ... as doubles
+
+``frombytes_many`` does not copy the payload: it returns a ``memoryview``
+of shape ``(count, 2)`` made with a single ``cast``::
+
+    >>> from vector2d_v3 import Vector2d
+    >>> octets = tobytes_many([Vector2d(3, 4), Vector2d(-1, 0.5)])
+    >>> len(octets)
+    48
+    >>> view = frombytes_many(octets)
+    >>> view.shape, view[1, 0], view.tolist()
+    ((2, 2), -1.0, [[3.0, 4.0], [-1.0, 0.5]])
+    >>> list(vectors(view))
+    [Vector2d(3.0, 4.0), Vector2d(-1.0, 0.5)]
+    >>> toarray(view)
+    Vector2dArray([3.0, -1.0], [4.0, 0.5])
+
+``memoryview.cast`` doesn't accept a 0 in the shape, so the view of an empty
+frame is one-dimensional, ``(0,)``; it works the same with the functions of
+this module::
+
+    >>> empty = frombytes_many(tobytes_many([]))
+    >>> empty.shape, empty.tolist(), list(vectors(empty)), toarray(empty)
+    ((0,), [], [], Vector2dArray([], []))
+
+Files bigger than RAM are read in chunks with ``iter_frames``, which also
+reads files made of several frames one after the other::
+
+    >>> import io
+    >>> fp = io.BytesIO()
+    >>> write_many(fp, [Vector2d(i, -i) for i in range(5)])
+    >>> write_many(fp, toarray(view))
+    >>> _ = fp.seek(0)
+    >>> [chunk.tolist() for chunk in iter_frames(fp, chunk_size=3)]
+    ... # doctest: +NORMALIZE_WHITESPACE
+    [[[0.0, 0.0], [1.0, -1.0], [2.0, -2.0]], [[3.0, -3.0], [4.0, -4.0]],
+     [[3.0, 4.0], [-1.0, 0.5]]]
+"""
+
+import struct
+import sys
+from array import array
+from itertools import chain
+from operator import attrgetter
+
+from vector2d_array import Vector2dArray
+from vector2d_v3 import Vector2d
+
+MAGIC = b'V2D\0'
+HEADER = struct.Struct('=4scc2xQ')
+BYTE_ORDERS = {'little': b'<', 'big': b'>'}
+CHUNK_SIZE = 2 ** 16
+XY = attrgetter('x', 'y')
+
+
+def _payload(vectors):
+    """Interleaved coordinates of ``vectors`` as an ``array('d')``"""
+    if isinstance(vectors, Vector2dArray):
+        pairs = array('d', bytes(16 * len(vectors)))
+        pairs[0::2] = vectors.x
+        pairs[1::2] = vectors.y
+        return pairs
+    # attrgetter evita el generador de Vector2d.__iter__
+    return array('d', chain.from_iterable(map(XY, vectors)))
+
+
+def _header(count):
+    return HEADER.pack(MAGIC, b'd', BYTE_ORDERS[sys.byteorder], count)
+
+
+def tobytes_many(vectors):
+    """Frame with ``vectors``, a ``Vector2dArray`` or iterable of vectors"""
+    pairs = _payload(vectors)
+    return _header(len(pairs) // 2) + pairs.tobytes()
+
+
+def write_many(fp, vectors):
+    """Write the frame of ``vectors`` to the binary file ``fp``"""
+    pairs = _payload(vectors)
+    fp.write(_header(len(pairs) // 2))
+    pairs.tofile(fp)
+
+
+def _check_header(octets):
+    magic, typecode, byte_order, count = HEADER.unpack_from(octets)
+    if magic != MAGIC or typecode != b'd':
+        raise ValueError('not a Vector2d frame')
+    if byte_order != BYTE_ORDERS[sys.byteorder]:
+        raise ValueError('frame written with a different byte order')
+    return count
+
+
+def frombytes_many(octets):
+    """``memoryview`` of shape ``(count, 2)`` over the payload of a frame"""
+    count = _check_header(octets)
+    payload = memoryview(octets)[HEADER.size:HEADER.size + count * 16]
+    if len(payload) != count * 16:
+        raise ValueError('truncated frame')
+    if not count:
+        # cast no admite un 0 en la forma
+        return payload.cast('B').cast('d')
+    return payload.cast('B').cast('d', [count, 2])
+
+
+def vectors(view):
+    """``Vector2d`` for each row of a view returned by ``frombytes_many``"""
+    flat = view.cast('B').cast('d')
+    return map(Vector2d, flat[0::2], flat[1::2])
+
+
+def toarray(view):
+    """Copy a view into a ``Vector2dArray`` (one strided copy per column)"""
+    flat = view.cast('B').cast('d')
+    return Vector2dArray._from_columns(array('d', flat[0::2].tobytes()),
+                                       array('d', flat[1::2].tobytes()))
+
+
+def iter_frames(fp, chunk_size=CHUNK_SIZE):
+    """Views of at most ``chunk_size`` vectors read from the frames of ``fp``
+
+    Only one chunk is in memory at a time.
+    """
+    while True:
+        header = fp.read(HEADER.size)
+        if not header:
+            return
+        if len(header) < HEADER.size:
+            raise ValueError('truncated frame header')
+        remaining = _check_header(header)
+        while remaining:
+            size = min(chunk_size, remaining)
+            chunk = bytearray(size * 16)
+            if fp.readinto(chunk) != len(chunk):
+                raise ValueError('truncated frame')
+            yield memoryview(chunk).cast('d', [size, 2])
+            remaining -= size
@@ -0,0 +1,56 @@
+import os
+import sys
+import tempfile
+import time
+
+from vector2d_array import Vector2dArray
+from vector2d_frames import (frombytes_many, iter_frames, tobytes_many,
+                             toarray, write_many)
+from vector2d_v3 import Vector2d
+
+NUM_VECTORS = 10**6
+
+
+def throughput(label, size, function):
+    t0 = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - t0
+    print('{:>32}: {:8.3f}s {:10.1f} MB/s'.format(
+        label, elapsed, size / elapsed / 2**20))
+    return result
+
+
+if len(sys.argv) == 2:
+    num_vectors = int(sys.argv[1])
+else:
+    num_vectors = NUM_VECTORS
+print('{:,} vectors'.format(num_vectors))
+
+vectors = [Vector2d(i, -i / 3) for i in range(num_vectors)]
+columns = Vector2dArray.fromvectors(vectors)
+size = num_vectors * 16
+
+#Un objeto cada vez: bytes(v) y Vector2d.frombytes
+octets = throughput('per object bytes(v)', size,
+                    lambda: b''.join(map(bytes, vectors)))
+throughput('per object frombytes', size,
+           lambda: [Vector2d.frombytes(octets[i:i + 17])
+                    for i in range(0, len(octets), 17)])
+
+#Un frame: cabecera + payload
+frame = throughput('tobytes_many(list)', size, lambda: tobytes_many(vectors))
+throughput('tobytes_many(Vector2dArray)', size,
+           lambda: tobytes_many(columns))
+view = throughput('frombytes_many (no copy)', size,
+                  lambda: frombytes_many(frame))
+throughput('frombytes_many + toarray', size,
+           lambda: toarray(frombytes_many(frame)))
+
+with tempfile.TemporaryDirectory() as tmp:
+    path = os.path.join(tmp, 'vectors.v2d')
+    with open(path, 'wb') as fp:
+        throughput('write_many to file', size, lambda: write_many(fp, columns))
+    with open(path, 'rb') as fp:
+        count = throughput('iter_frames from file', size,
+                           lambda: sum(len(chunk) for chunk in iter_frames(fp)))
+    assert count == num_vectors